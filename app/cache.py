@@ -0,0 +1,55 @@
+"""
+Redis cache client and helpers for AI Verification Service
+
+Kept apart from the database module so services that only need the cache
+do not create the database engine on import.
+"""
+
+from typing import Optional
+import logging
+import redis.asyncio as redis
+
+from app.config import get_settings
+
+__all__ = [
+    "redis_client",
+    "get_cached",
+    "set_cached",
+]
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Create Redis client only if caching is enabled
+redis_client = None
+
+if settings.cache_enabled and settings.redis_url:
+    try:
+        redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+        logger.info("Redis cache client created successfully")
+    except Exception as e:
+        logger.warning(f"Failed to create Redis client: {e}")
+        redis_client = None
+
+
+async def get_cached(key: str) -> Optional[str]:
+    """Get a cached value, or None on miss or when caching is disabled"""
+    if redis_client is None:
+        return None
+    
+    try:
+        return await redis_client.get(key)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+
+
+async def set_cached(key: str, value: str, ttl_seconds: int = None):
+    """Cache a value, silently skipping when caching is disabled"""
+    if redis_client is None:
+        return
+    
+    try:
+        await redis_client.set(key, value, ex=ttl_seconds or settings.cache_ttl_seconds)
+    except Exception as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
@@ -2,8 +2,9 @@
 Configuration management for AI Verification Service
 """
 
-from pydantic_settings import BaseSettings
-from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional, List
+from functools import lru_cache, cached_property
 import os
 
 
@@ -15,16 +16,26 @@ class Settings(BaseSettings):
     service_port: int = 8001
     debug: bool = False
     log_level: str = "INFO"
+    workers: int = 1
     
     # Database
     database_url: Optional[str] = None
+    db_pool_size: int = 25
+    db_max_overflow: int = 25
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 3600
+    db_statement_timeout_ms: int = 60000
+    db_health_cache_seconds: float = 5.0
     
     # AI Models
-    fake_detection_model_path: str = "models/fake_detector.pth"
+    fake_detection_model_path: str = "models/fake_detector.int8.onnx"
     fake_detection_enabled: bool = True
     
+    # Minimum dHash similarity (1 - Hamming distance / 64) to flag a duplicate
     duplicate_threshold: float = 0.85
     duplicate_detection_enabled: bool = True
+    # How often each worker reloads hashes other workers saved to Redis
+    duplicate_hash_refresh_seconds: float = 30.0
     
     location_radius_meters: float = 100.0
     location_validation_enabled: bool = True
@@ -51,14 +62,24 @@ class Settings(BaseSettings):
     
     # Performance & Limits
     max_image_size_mb: int = 10
+    max_image_pixels: int = 30_000_000
     max_images_per_request: int = 10
     request_timeout_seconds: int = 30
     max_concurrent_requests: int = 10
+    max_concurrent_downloads: int = 16
     
     # Caching
     redis_url: Optional[str] = None
     cache_enabled: bool = False
     cache_ttl_seconds: int = 3600
+    stats_cache_ttl_seconds: int = 5
+    category_cache_size: int = 1024
+    category_cache_ttl_seconds: int = 600
+    image_cache_size: int = 128
+    image_cache_max_bytes: int = 64 * 1024 * 1024
+    image_cache_ttl_seconds: int = 300
+    search_cache_size: int = 10000
+    search_cache_ttl_seconds: int = 86400
     
     # Monitoring
     prometheus_enabled: bool = True
@@ -70,15 +91,20 @@ class Settings(BaseSettings):
     enable_internet_search: bool = False
     enable_advanced_analysis: bool = False
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-
-
-# Global settings instance
-settings = Settings()
+    @cached_property
+    def allowed_origins_list(self) -> List[str]:
+        """CORS origins parsed once from the comma-separated setting"""
+        return [origin.strip() for origin in self.allowed_origins.split(",") if origin.strip()]
+    
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get application settings"""
-    return settings
+    """
+    Get application settings
+    
+    Settings are built (and .env parsed) once on first call and shared by
+    every module afterwards.
+    """
+    return Settings()
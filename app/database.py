@@ -2,31 +2,82 @@
 Database connection and models for AI Verification Service
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, Text, ARRAY, JSON
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ARRAY, Index, select, insert, func, bindparam, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base, selectinload
 from datetime import datetime
-from typing import Generator
+from typing import AsyncGenerator, Dict, Iterable, List, Tuple, Optional
 import logging
+import time
+import orjson
 
+from app.cache import redis_client, get_cached, set_cached
 from app.config import get_settings
+from app.models import VerificationStatusResponse
+
+__all__ = [
+    "engine",
+    "SessionLocal",
+    "Base",
+    "AIVerification",
+    "TimelineEvent",
+    "get_db",
+    "init_db",
+    "check_db_connection",
+    "save_verification_result",
+    "create_timeline_event",
+    "save_verifications_bulk",
+    "bulk_persist",
+    "persist_verification",
+    "get_verification_by_issue_id",
+    "get_all_verifications_for_issue",
+    "get_timeline_events",
+    "get_verification_stats",
+    "get_cached_verification",
+    "cache_verification",
+]
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+
+def _async_database_url(url: str) -> str:
+    """Rewrite a plain PostgreSQL URL to use the asyncpg driver"""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
 # Create database engine only if database_url is provided
 engine = None
 SessionLocal = None
 
 if settings.database_url:
     try:
-        engine = create_engine(
-            settings.database_url,
+        engine = create_async_engine(
+            _async_database_url(settings.database_url),
             pool_pre_ping=True,
-            pool_size=10,
-            max_overflow=20
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            query_cache_size=1200,
+            json_serializer=lambda obj: orjson.dumps(obj).decode(),
+            json_deserializer=orjson.loads,
+            isolation_level="READ COMMITTED",
+            # Stop runaway queries from pinning a pooled connection
+            connect_args={
+                "server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)}
+            }
+        )
+        SessionLocal = async_sessionmaker(
+            bind=engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False
         )
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
         logger.info("Database engine created successfully")
     except Exception as e:
         logger.warning(f"Failed to create database engine: {e}")
@@ -46,6 +97,10 @@ Base = declarative_base()
 class AIVerification(Base):
     """AI Verification results table"""
     __tablename__ = "ai_verifications"
+    __table_args__ = (
+        # Serves "latest verification for issue" as a single index scan
+        Index("ix_ai_verif_issue_created", "issue_id", text("created_at DESC")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     issue_id = Column(Integer, nullable=False, index=True)
@@ -53,14 +108,17 @@ class AIVerification(Base):
     status = Column(String(20), nullable=False, index=True)
     confidence_score = Column(Float)
     rejection_reasons = Column(ARRAY(Text))
-    checks_performed = Column(JSON)
-    extra_data = Column("metadata", JSON)  # Map to 'metadata' column in DB
+    checks_performed = Column(JSONB)
+    extra_data = Column("metadata", JSONB)  # Map to 'metadata' column in DB
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
 class TimelineEvent(Base):
     """Timeline events table"""
     __tablename__ = "timeline_events"
+    __table_args__ = (
+        Index("ix_timeline_issue_created", "issue_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     issue_id = Column(Integer, nullable=False, index=True)
@@ -68,7 +126,7 @@ class TimelineEvent(Base):
     actor_type = Column(String(20), nullable=False)
     actor_id = Column(Integer)
     description = Column(Text, nullable=False)
-    extra_data = Column("metadata", JSON)  # Map to 'metadata' column in DB
+    extra_data = Column("metadata", JSONB)  # Map to 'metadata' column in DB
     image_urls = Column(ARRAY(Text))
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -77,72 +135,95 @@ class TimelineEvent(Base):
 # Database Utilities
 # ================================
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Get database session
     
     Usage:
-        with get_db() as db:
-            # Use db session
+        db: AsyncSession = Depends(get_db)
     """
     if SessionLocal is None:
         logger.warning("Database not configured, skipping database operation")
         yield None
         return
         
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    async with SessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            # Don't hand an "idle in transaction" connection back to the pool
+            await db.rollback()
+            raise
 
 
-def init_db():
+async def init_db():
     """Initialize database tables"""
     if engine is None:
         logger.warning("Database not configured, skipping initialization")
         return
         
     try:
-        Base.metadata.create_all(bind=engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
         logger.info("Database tables initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
 
 
-def check_db_connection() -> bool:
+# Last health check result, reused for db_health_cache_seconds so frequent
+# /health probes don't each cost a database roundtrip
+_db_health = {"ok": False, "checked_at": None}
+
+
+async def check_db_connection() -> bool:
     """Check if database connection is healthy"""
     if SessionLocal is None or engine is None:
         logger.warning("Database not configured")
         return False
+    
+    now = time.monotonic()
+    checked_at = _db_health["checked_at"]
+    if checked_at is not None and now - checked_at < settings.db_health_cache_seconds:
+        return _db_health["ok"]
         
     try:
-        db = SessionLocal()
-        db.execute("SELECT 1")
-        db.close()
-        return True
+        # pool_pre_ping validates the connection on checkout, so an explicit
+        # SELECT 1 would just be a second roundtrip
+        async with engine.connect():
+            pass
+        ok = True
     except Exception as e:
         logger.error(f"Database connection check failed: {e}")
-        return False
+        ok = False
+    
+    _db_health["ok"] = ok
+    _db_health["checked_at"] = now
+    return ok
 
 
 # ================================
 # Database Operations
 # ================================
 
-def save_verification_result(
-    db: Session,
+async def save_verification_result(
+    db: AsyncSession,
     issue_id: int,
     verification_type: str,
     status: str,
     confidence_score: float,
     rejection_reasons: list,
     checks_performed: dict,
-    extra_data: dict = None
+    extra_data: dict = None,
+    autocommit: bool = True
 ) -> AIVerification:
-    """Save verification result to database"""
-    verification = AIVerification(
+    """
+    Save verification result to database
+    
+    Pass autocommit=False to only stage the row and persist it together
+    with other objects via bulk_persist().
+    """
+    values = dict(
         issue_id=issue_id,
         verification_type=verification_type,
         status=status,
@@ -151,24 +232,114 @@ def save_verification_result(
         checks_performed=checks_performed,
         extra_data=extra_data or {}
     )
-    db.add(verification)
-    db.commit()
-    db.refresh(verification)
+    if not autocommit:
+        verification = AIVerification(**values)
+        db.add(verification)
+        return verification
+    
+    # INSERT ... RETURNING gives back the stored row in the same roundtrip
+    result = await db.execute(
+        insert(AIVerification).values(**values).returning(AIVerification)
+    )
+    verification = result.scalar_one()
+    await db.commit()
+    await cache_verification(verification)
     return verification
 
 
-def create_timeline_event(
-    db: Session,
+async def save_verifications_bulk(db: AsyncSession, rows: List[dict]) -> List[AIVerification]:
+    """
+    Save many verification results in one transaction
+    
+    Args:
+        rows: Dicts of save_verification_result() keyword arguments (without db)
+        
+    Returns:
+        Stored AIVerification rows, in input order
+    """
+    if not rows:
+        return []
+    
+    # SQLAlchemy batches executemany-style INSERT ... RETURNING into
+    # multi-row statements
+    result = await db.execute(
+        insert(AIVerification).returning(AIVerification, sort_by_parameter_order=True),
+        [{**row, "extra_data": row.get("extra_data") or {}} for row in rows]
+    )
+    verifications = result.scalars().all()
+    await db.commit()
+    
+    for verification in verifications:
+        await cache_verification(verification)
+    return verifications
+
+
+async def persist_verification(
+    issue_id: int,
+    verification_type: str,
+    status: str,
+    confidence_score: float,
+    rejection_reasons: list,
+    checks_performed: dict,
+    event_type: str,
+    description: str,
+    event_extra_data: dict = None
+):
+    """
+    Persist a verification result and its timeline event in a new session
+    
+    Meant to run as a background task after the response has been sent, so
+    it opens its own session instead of using the request-scoped one and
+    logs failures rather than raising them.
+    """
+    if SessionLocal is None:
+        logger.warning("Database not configured, skipping persisting verification")
+        return
+    
+    try:
+        async with SessionLocal() as db:
+            verification = await save_verification_result(
+                db=db,
+                issue_id=issue_id,
+                verification_type=verification_type,
+                status=status,
+                confidence_score=confidence_score,
+                rejection_reasons=rejection_reasons,
+                checks_performed=checks_performed,
+                autocommit=False
+            )
+            event = await create_timeline_event(
+                db=db,
+                issue_id=issue_id,
+                event_type=event_type,
+                actor_type="AI",
+                description=description,
+                extra_data=event_extra_data,
+                autocommit=False
+            )
+            await bulk_persist(db, verification, event)
+    except Exception as e:
+        logger.error(f"Failed to persist verification for issue #{issue_id}: {e}")
+
+
+async def create_timeline_event(
+    db: AsyncSession,
     issue_id: int,
     event_type: str,
     actor_type: str,
     description: str,
     actor_id: int = None,
     extra_data: dict = None,
-    image_urls: list = None
+    image_urls: list = None,
+    autocommit: bool = True
 ) -> TimelineEvent:
-    """Create a timeline event"""
-    event = TimelineEvent(
+    """
+    Create a timeline event
+    
+    Pass autocommit=False to only stage the row and persist it together
+    with other objects via bulk_persist().
+    """
+    values = dict(
         issue_id=issue_id,
         event_type=event_type,
         actor_type=actor_type,
@@ -177,31 +348,154 @@ def create_timeline_event(
         extra_data=extra_data or {},
         image_urls=image_urls or []
     )
-    db.add(event)
-    db.commit()
-    db.refresh(event)
+    if not autocommit:
+        event = TimelineEvent(**values)
+        db.add(event)
+        return event
+    
+    result = await db.execute(
+        insert(TimelineEvent).values(**values).returning(TimelineEvent)
+    )
+    event = result.scalar_one()
+    await db.commit()
     return event
 
 
-def get_verification_by_issue_id(db: Session, issue_id: int) -> AIVerification:
+async def bulk_persist(
+    db: AsyncSession,
+    verification: AIVerification,
+    event: TimelineEvent
+) -> AIVerification:
+    """Persist a verification and its timeline event in a single transaction"""
+    db.add_all([verification, event])
+    # The flush fetches generated ids via RETURNING and created_at is set
+    # client-side, so no refresh query is needed after commit
+    await db.flush()
+    await db.commit()
+    await cache_verification(verification)
+    return verification
+
+
+# Query statements are built once and parameterized with bind params so
+# every call hits SQLAlchemy's compiled-statement cache
+_STMT_LATEST_VERIFICATION = select(AIVerification)\
+    .where(AIVerification.issue_id == bindparam("issue_id"))\
+    .order_by(AIVerification.created_at.desc())\
+    .limit(1)
+
+_STMT_ALL_VERIFICATIONS = select(AIVerification)\
+    .where(AIVerification.issue_id == bindparam("issue_id"))\
+    .order_by(AIVerification.created_at.desc())
+
+_STMT_TIMELINE_EVENTS = select(TimelineEvent)\
+    .where(TimelineEvent.issue_id == bindparam("issue_id"))\
+    .order_by(TimelineEvent.created_at.asc())
+
+
+async def get_verification_by_issue_id(db: AsyncSession, issue_id: int) -> AIVerification:
     """Get latest verification for an issue"""
-    return db.query(AIVerification)\
-        .filter(AIVerification.issue_id == issue_id)\
-        .order_by(AIVerification.created_at.desc())\
-        .first()
+    result = await db.execute(_STMT_LATEST_VERIFICATION, {"issue_id": issue_id})
+    return result.scalar_one_or_none()
 
 
-def get_all_verifications_for_issue(db: Session, issue_id: int) -> list:
-    """Get all verifications for an issue"""
-    return db.query(AIVerification)\
-        .filter(AIVerification.issue_id == issue_id)\
-        .order_by(AIVerification.created_at.desc())\
-        .all()
+async def get_all_verifications_for_issue(
+    db: AsyncSession,
+    issue_id: int,
+    *,
+    load: Iterable[str] = ()
+) -> list:
+    """
+    Get all verifications for an issue
+    
+    Args:
+        load: Relationship attribute names to eager-load with selectinload,
+              so callers touching related rows don't trigger N+1 queries
+    """
+    query = _STMT_ALL_VERIFICATIONS
+    for name in load:
+        query = query.options(selectinload(getattr(AIVerification, name)))
+    
+    result = await db.execute(query, {"issue_id": issue_id})
+    return result.scalars().all()
 
 
-def get_timeline_events(db: Session, issue_id: int) -> list:
+async def get_timeline_events(
+    db: AsyncSession,
+    issue_id: int,
+    *,
+    load: Iterable[str] = ()
+) -> list:
     """Get all timeline events for an issue"""
-    return db.query(TimelineEvent)\
-        .filter(TimelineEvent.issue_id == issue_id)\
-        .order_by(TimelineEvent.created_at.asc())\
-        .all()
+    query = _STMT_TIMELINE_EVENTS
+    for name in load:
+        query = query.options(selectinload(getattr(TimelineEvent, name)))
+    
+    result = await db.execute(query, {"issue_id": issue_id})
+    return result.scalars().all()
+
+
+async def get_verification_stats(db: AsyncSession) -> Tuple[Dict[str, int], float, float]:
+    """
+    Aggregate verification statistics in the database
+    
+    Returns:
+        (counts_by_status, average_confidence, average_processing_time_ms)
+    """
+    result = await db.execute(
+        select(
+            AIVerification.status,
+            func.count(AIVerification.id),
+            func.sum(AIVerification.confidence_score),
+            func.count(AIVerification.confidence_score)
+        ).group_by(AIVerification.status)
+    )
+    
+    counts_by_status = {}
+    confidence_sum = 0.0
+    confidence_count = 0
+    for status, count, status_confidence_sum, status_confidence_count in result:
+        counts_by_status[status] = count
+        confidence_sum += status_confidence_sum or 0.0
+        confidence_count += status_confidence_count
+    
+    avg_confidence = confidence_sum / confidence_count if confidence_count else 0.0
+    
+    # Processing time is recorded on the completion event of each initial verification
+    avg_processing_time = await db.scalar(
+        select(func.avg(TimelineEvent.extra_data["processing_time_ms"].as_float()))
+        .where(TimelineEvent.event_type == "AI_VERIFICATION_COMPLETED")
+    )
+    return counts_by_status, avg_confidence, float(avg_processing_time or 0.0)
+
+
+# ================================
+# Cache Operations
+# ================================
+
+def _verification_cache_key(issue_id: int) -> str:
+    return f"verif:{issue_id}"
+
+
+async def get_cached_verification(issue_id: int) -> Optional[VerificationStatusResponse]:
+    """Get cached latest verification status for an issue"""
+    cached = await get_cached(_verification_cache_key(issue_id))
+    if cached is None:
+        return None
+    return VerificationStatusResponse.model_validate_json(cached)
+
+
+async def cache_verification(verification: AIVerification):
+    """Cache a verification as the latest status for its issue"""
+    if redis_client is None:
+        return
+    
+    response = VerificationStatusResponse(
+        issue_id=verification.issue_id,
+        verification_type=verification.verification_type,
+        status=verification.status,
+        confidence_score=verification.confidence_score,
+        created_at=verification.created_at,
+        updated_at=verification.created_at,
+        checks_performed=verification.checks_performed
+    )
+    await set_cached(_verification_cache_key(verification.issue_id), response.model_dump_json())
@@ -4,15 +4,20 @@ CivicFix AI Verification Service - Main Application
 FastAPI application for AI-driven verification of civic issues
 """
 
+import asyncio
 import logging
+import orjson
 import time
-from datetime import datetime
-from fastapi import FastAPI, HTTPException, Depends, Header
+from datetime import datetime, timezone
+from operator import attrgetter
+from fastapi import FastAPI, HTTPException, Depends, Header, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
-from sqlalchemy.orm import Session
+from prometheus_client import Counter, Histogram, make_asgi_app
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import get_cached, set_cached
 from app.config import get_settings
 from app.database import get_db, init_db, check_db_connection
 from app.models import (
@@ -31,6 +36,7 @@ from app.models import (
     VerificationChecks
 )
 from app.services.assistant_service import AssistantService, ChatRequest, ChatResponse
+from app.services.http_client import get_http_client, close_http_client
 from app.services import (
     FakeDetectionService,
     DuplicateDetectionService,
@@ -41,9 +47,11 @@ from app.services import (
     InternetSearchService
 )
 from app.database import (
-    save_verification_result,
-    create_timeline_event,
-    get_verification_by_issue_id
+    persist_verification,
+    get_verification_by_issue_id,
+    get_verification_stats,
+    get_cached_verification,
+    cache_verification
 )
 
 # Configure logging
@@ -55,18 +63,39 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+# Hot-path configuration, bound once at import
+FAKE_DETECTION_ENABLED = settings.fake_detection_enabled
+DUPLICATE_DETECTION_ENABLED = settings.duplicate_detection_enabled
+LOCATION_VALIDATION_ENABLED = settings.location_validation_enabled
+CATEGORY_VALIDATION_ENABLED = settings.category_validation_enabled
+INTERNET_SEARCH_ENABLED = settings.enable_internet_search
+AUTO_APPROVE_THRESHOLD = settings.auto_approve_threshold
+AUTO_REJECT_THRESHOLD = settings.auto_reject_threshold
+MAX_IMAGES_PER_REQUEST = settings.max_images_per_request
+
 # Service start time for uptime tracking
 SERVICE_START_TIME = time.time()
 
-# Statistics tracking
-stats = {
-    "total_verifications": 0,
-    "approved": 0,
-    "rejected": 0,
-    "pending": 0,
-    "total_processing_time_ms": 0
+# Statistics tracking (Prometheus metrics are safe to update concurrently)
+VERIFICATIONS_TOTAL = Counter(
+    "civicfix_verifications_total",
+    "Completed initial verifications by resulting status",
+    ["status"]
+)
+PROCESSING_TIME_MS = Histogram(
+    "civicfix_processing_time_ms",
+    "Initial verification processing time in milliseconds",
+    buckets=(50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+)
+
+# Counter children bound once per status, keyed by enum member
+_VERIFICATIONS_BY_STATUS = {
+    status: VERIFICATIONS_TOTAL.labels(status=status.value)
+    for status in VerificationStatus
 }
 
+STATS_CACHE_KEY = "stats"
+
 
 # Lifespan context manager
 @asynccontextmanager
@@ -75,15 +104,19 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting CivicFix AI Verification Service...")
     try:
-        init_db()
+        await init_db()
         logger.info("Database initialized")
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
     
+    app.state.http_client = get_http_client()
+    await duplicate_detection_service.load_hashes()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down CivicFix AI Verification Service...")
+    await close_http_client()
 
 
 # Create FastAPI app
@@ -91,11 +124,12 @@ app = FastAPI(
     title="CivicFix AI Verification Service",
     description="AI-driven verification for civic issue reporting",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
-origins = settings.allowed_origins.split(",")
+origins = settings.allowed_origins_list
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -104,6 +138,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Expose Prometheus metrics
+if settings.prometheus_enabled:
+    app.mount("/metrics", make_asgi_app())
+
 # Initialize services
 fake_detection_service = FakeDetectionService()
 duplicate_detection_service = DuplicateDetectionService()
@@ -134,7 +172,7 @@ async def verify_api_key(x_api_key: str = Header(...)):
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
-    db_status = "healthy" if check_db_connection() else "unhealthy"
+    db_status = "healthy" if await check_db_connection() else "unhealthy"
     
     return HealthResponse(
         status="healthy",
@@ -149,15 +187,49 @@ async def health_check():
     )
 
 
-    return StatsResponse(
-        total_verifications=stats["total_verifications"],
-        approved=stats["approved"],
-        rejected=stats["rejected"],
-        pending=stats["pending"],
+@app.get("/api/v1/stats", response_model=StatsResponse)
+async def get_stats(
+    api_key: str = Depends(verify_api_key),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get verification statistics"""
+    # Only the database aggregates are cached, since every worker and replica
+    # shares them; uptime is this process's own
+    uptime = int(time.time() - SERVICE_START_TIME)
+    
+    cached = await get_cached(STATS_CACHE_KEY)
+    if cached is not None:
+        return StatsResponse(**orjson.loads(cached), uptime_seconds=uptime)
+    
+    status_counts = {}
+    avg_confidence = 0.0
+    avg_processing_time = 0.0
+    if db is not None:
+        try:
+            status_counts, avg_confidence, avg_processing_time = await get_verification_stats(db)
+        except Exception as e:
+            logger.error(f"Failed to aggregate verification stats: {e}")
+    
+    total_verifications = sum(status_counts.values())
+    approved = status_counts.get(VerificationStatus.APPROVED.value, 0)
+    rejected = status_counts.get(VerificationStatus.REJECTED.value, 0)
+    
+    response = StatsResponse(
+        total_verifications=total_verifications,
+        approved=approved,
+        rejected=rejected,
+        pending=total_verifications - approved - rejected,
         average_confidence=avg_confidence,
-        average_processing_time_ms=avg_processing_time,
+        average_processing_time_ms=int(avg_processing_time),
         uptime_seconds=uptime
     )
+    await set_cached(
+        STATS_CACHE_KEY,
+        response.model_dump_json(exclude={"uptime_seconds"}),
+        settings.stats_cache_ttl_seconds
+    )
+    
+    return response
 
 
 @app.post("/api/v1/assistant/chat", response_model=ChatResponse)
@@ -181,8 +253,8 @@ async def chat_with_assistant(
 @app.post("/api/v1/verify/initial", response_model=InitialVerificationResponse)
 async def verify_initial_issue(
     request: InitialVerificationRequest,
-    api_key: str = Depends(verify_api_key),
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    api_key: str = Depends(verify_api_key)
 ):
     """
     Verify newly submitted issue
@@ -197,82 +269,47 @@ async def verify_initial_issue(
     """
     start_time = time.time()
     
+    # Reject bad input before starting any checks
+    if not request.image_urls:
+        raise HTTPException(status_code=422, detail="image_urls required")
+    if len(request.image_urls) > MAX_IMAGES_PER_REQUEST:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {MAX_IMAGES_PER_REQUEST} images allowed per request"
+        )
+    
+    primary_image_url = request.image_urls[0]
+    
     try:
         logger.info(f"Starting initial verification for issue #{request.issue_id}")
         
-        # Run all verification checks
-        checks_results = {}
-        
-        # 1. Fake Detection
-        if settings.fake_detection_enabled:
-            fake_results = await fake_detection_service.batch_detect(request.image_urls)
-            # Use worst result
-            fake_check = min(fake_results, key=lambda x: x.confidence)
-            checks_results["fake_detection"] = fake_check
-        else:
-            checks_results["fake_detection"] = CheckResult(
-                status=CheckStatus.SKIPPED,
-                confidence=0.0,
-                details="Fake detection disabled"
-            )
-        
-        # 2. Duplicate Detection
-        if settings.duplicate_detection_enabled:
-            dup_results = await duplicate_detection_service.batch_detect(
-                request.image_urls,
-                request.issue_id
-            )
-            # Use worst result
-            dup_check = min(dup_results, key=lambda x: x.confidence)
-            checks_results["duplicate_detection"] = dup_check
-        else:
-            checks_results["duplicate_detection"] = CheckResult(
-                status=CheckStatus.SKIPPED,
-                confidence=0.0,
-                details="Duplicate detection disabled"
-            )
-        
-        # 3. Metadata Validation
-        metadata_check = await metadata_validator_service.validate_metadata(
-            request.image_urls[0]
-        )
-        checks_results["metadata_validation"] = metadata_check
+        # Run all verification checks concurrently
+        check_runners = {
+            "fake_detection": _run_fake_detection(request),
+            "duplicate_detection": _run_duplicate_detection(request),
+            "metadata_validation": _run_metadata_validation(primary_image_url),
+            "location_consistency": _run_location_validation(primary_image_url, request),
+            "category_relevance": _run_category_validation(primary_image_url, request),
+        }
         
-        # 4. Location Consistency
-        if settings.location_validation_enabled:
-            location_check = await location_validator_service.validate_location(
-                request.image_urls[0],
-                request.location
-            )
-            checks_results["location_consistency"] = location_check
-        else:
-            checks_results["location_consistency"] = CheckResult(
-                status=CheckStatus.SKIPPED,
-                confidence=0.0,
-                details="Location validation disabled"
+        # Internet Search (optional)
+        if INTERNET_SEARCH_ENABLED:
+            check_runners["internet_search"] = internet_search_service.search_image(
+                primary_image_url
             )
         
-        # 5. Category Relevance
-        if settings.category_validation_enabled:
-            category_check = await category_validator_service.validate_category(
-                request.image_urls[0],
-                request.category,
-                request.description
-            )
-            checks_results["category_relevance"] = category_check
-        else:
-            checks_results["category_relevance"] = CheckResult(
-                status=CheckStatus.SKIPPED,
-                confidence=0.0,
-                details="Category validation disabled"
-            )
+        results = await asyncio.gather(*check_runners.values(), return_exceptions=True)
         
-        # 6. Internet Search (optional)
-        if settings.enable_internet_search:
-            internet_check = await internet_search_service.search_image(
-                request.image_urls[0]
-            )
-            checks_results["internet_search"] = internet_check
+        checks_results = {}
+        for name, result in zip(check_runners, results):
+            if isinstance(result, Exception):
+                logger.error(f"Check {name} failed for issue #{request.issue_id}: {result}")
+                result = CheckResult(
+                    status=CheckStatus.FAILED,
+                    confidence=0.0,
+                    details=f"Check error: {str(result)}"
+                )
+            checks_results[name] = result
         
         # Create VerificationChecks object
         checks = VerificationChecks(**checks_results)
@@ -283,46 +320,20 @@ async def verify_initial_issue(
         # Calculate processing time
         processing_time_ms = int((time.time() - start_time) * 1000)
         
-        # Save to database
-        save_verification_result(
-            db=db,
-            issue_id=request.issue_id,
-            verification_type=VerificationType.INITIAL,
-            status=status,
-            confidence_score=confidence_score,
-            rejection_reasons=rejection_reasons,
-            checks_performed={
-                "fake_detection": checks.fake_detection.dict(),
-                "duplicate_detection": checks.duplicate_detection.dict(),
-                "metadata_validation": checks.metadata_validation.dict(),
-                "location_consistency": checks.location_consistency.dict(),
-                "category_relevance": checks.category_relevance.dict()
-            }
-        )
-        
-        # Create timeline event
-        create_timeline_event(
-            db=db,
-            issue_id=request.issue_id,
-            event_type="AI_VERIFICATION_COMPLETED",
-            actor_type="AI",
-            description=f"AI verification completed with status: {status}",
-            extra_data={
-                "confidence_score": confidence_score,
-                "status": status,
-                "processing_time_ms": processing_time_ms
-            }
+        # Persist after the response has been sent
+        background_tasks.add_task(
+            _persist_initial_verification,
+            request.issue_id,
+            status,
+            confidence_score,
+            rejection_reasons,
+            checks,
+            processing_time_ms
         )
         
         # Update statistics
-        stats["total_verifications"] += 1
-        stats["total_processing_time_ms"] += processing_time_ms
-        if status == VerificationStatus.APPROVED:
-            stats["approved"] += 1
-        elif status == VerificationStatus.REJECTED:
-            stats["rejected"] += 1
-        else:
-            stats["pending"] += 1
+        _VERIFICATIONS_BY_STATUS[status].inc()
+        PROCESSING_TIME_MS.observe(processing_time_ms)
         
         logger.info(
             f"Verification completed for issue #{request.issue_id}: "
@@ -347,8 +358,8 @@ async def verify_initial_issue(
 @app.post("/api/v1/verify/cross-check", response_model=CrossVerificationResponse)
 async def verify_cross_check(
     request: CrossVerificationRequest,
-    api_key: str = Depends(verify_api_key),
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    api_key: str = Depends(verify_api_key)
 ):
     """
     Cross-verify citizen vs government images
@@ -372,9 +383,9 @@ async def verify_cross_check(
         )
         
         # Determine status based on results
-        if result.confidence >= settings.auto_approve_threshold and result.work_appears_completed:
+        if result.confidence >= AUTO_APPROVE_THRESHOLD and result.work_appears_completed:
             status = VerificationStatus.APPROVED
-        elif result.confidence <= settings.auto_reject_threshold or not result.same_location:
+        elif result.confidence <= AUTO_REJECT_THRESHOLD or not result.same_location:
             status = VerificationStatus.REJECTED
         else:
             status = VerificationStatus.NEEDS_REVIEW
@@ -382,9 +393,9 @@ async def verify_cross_check(
         # Calculate processing time
         processing_time_ms = int((time.time() - start_time) * 1000)
         
-        # Save to database
-        save_verification_result(
-            db=db,
+        # Persist after the response has been sent
+        background_tasks.add_task(
+            persist_verification,
             issue_id=request.issue_id,
             verification_type=VerificationType.CROSS_VERIFICATION,
             status=status,
@@ -394,17 +405,10 @@ async def verify_cross_check(
                 "same_location": result.same_location,
                 "work_completed": result.work_appears_completed,
                 "similarity_score": result.similarity_score
-            }
-        )
-        
-        # Create timeline event
-        create_timeline_event(
-            db=db,
-            issue_id=request.issue_id,
+            },
             event_type="AI_CROSS_VERIFICATION_COMPLETED",
-            actor_type="AI",
             description=f"Cross-verification completed: {result.notes}",
-            extra_data={
+            event_extra_data={
                 "confidence": result.confidence,
                 "status": status,
                 "work_completed": result.work_appears_completed
@@ -437,15 +441,21 @@ async def verify_cross_check(
 async def get_verification_status(
     issue_id: int,
     api_key: str = Depends(verify_api_key),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get verification status for an issue"""
     try:
-        verification = get_verification_by_issue_id(db, issue_id)
+        cached = await get_cached_verification(issue_id)
+        if cached is not None:
+            return cached
+        
+        verification = await get_verification_by_issue_id(db, issue_id)
         
         if not verification:
             raise HTTPException(status_code=404, detail="Verification not found")
         
+        await cache_verification(verification)
+        
         return VerificationStatusResponse(
             issue_id=verification.issue_id,
             verification_type=verification.verification_type,
@@ -467,6 +477,137 @@ async def get_verification_status(
 # Helper Functions
 # ================================
 
+async def _persist_initial_verification(
+    issue_id: int,
+    status: VerificationStatus,
+    confidence_score: float,
+    rejection_reasons: list,
+    checks: VerificationChecks,
+    processing_time_ms: int
+):
+    """Serialize and persist an initial verification (runs as a background task)"""
+    await persist_verification(
+        issue_id=issue_id,
+        verification_type=VerificationType.INITIAL,
+        status=status,
+        confidence_score=confidence_score,
+        rejection_reasons=rejection_reasons,
+        checks_performed=checks.model_dump(mode="json", exclude={"internet_search"}),
+        event_type="AI_VERIFICATION_COMPLETED",
+        description=f"AI verification completed with status: {status}",
+        event_extra_data={
+            "confidence_score": confidence_score,
+            "status": status,
+            "processing_time_ms": processing_time_ms
+        }
+    )
+
+
+# Results for disabled checks, built once since CheckResult is immutable
+_FAKE_DETECTION_SKIPPED = CheckResult(
+    status=CheckStatus.SKIPPED,
+    confidence=0.0,
+    details="Fake detection disabled"
+)
+_DUPLICATE_DETECTION_SKIPPED = CheckResult(
+    status=CheckStatus.SKIPPED,
+    confidence=0.0,
+    details="Duplicate detection disabled"
+)
+_LOCATION_VALIDATION_SKIPPED = CheckResult(
+    status=CheckStatus.SKIPPED,
+    confidence=0.0,
+    details="Location validation disabled"
+)
+_CATEGORY_VALIDATION_SKIPPED = CheckResult(
+    status=CheckStatus.SKIPPED,
+    confidence=0.0,
+    details="Category validation disabled"
+)
+
+
+def _worst_check(results: list) -> CheckResult:
+    """Return the lowest-confidence result in a single pass"""
+    results_iter = iter(results)
+    worst = next(results_iter)
+    worst_confidence = worst.confidence
+    for result in results_iter:
+        if result.confidence < worst_confidence:
+            worst = result
+            worst_confidence = result.confidence
+    return worst
+
+
+async def _run_fake_detection(request: InitialVerificationRequest) -> CheckResult:
+    """Run fake detection over all images, keeping the worst result"""
+    if not FAKE_DETECTION_ENABLED:
+        return _FAKE_DETECTION_SKIPPED
+    
+    fake_results = await fake_detection_service.batch_detect(request.image_urls)
+    return _worst_check(fake_results)
+
+
+async def _run_duplicate_detection(request: InitialVerificationRequest) -> CheckResult:
+    """Run duplicate detection over all images, keeping the worst result"""
+    if not DUPLICATE_DETECTION_ENABLED:
+        return _DUPLICATE_DETECTION_SKIPPED
+    
+    dup_results = await duplicate_detection_service.batch_detect(
+        request.image_urls,
+        request.issue_id
+    )
+    return _worst_check(dup_results)
+
+
+async def _run_metadata_validation(image_url: str) -> CheckResult:
+    """Validate metadata of the primary image"""
+    return await metadata_validator_service.validate_metadata(image_url)
+
+
+async def _run_location_validation(
+    image_url: str,
+    request: InitialVerificationRequest
+) -> CheckResult:
+    """Validate the reported location against the primary image"""
+    if not LOCATION_VALIDATION_ENABLED:
+        return _LOCATION_VALIDATION_SKIPPED
+    
+    return await location_validator_service.validate_location(
+        image_url,
+        request.location
+    )
+
+
+async def _run_category_validation(
+    image_url: str,
+    request: InitialVerificationRequest
+) -> CheckResult:
+    """Validate the reported category against the primary image"""
+    if not CATEGORY_VALIDATION_ENABLED:
+        return _CATEGORY_VALIDATION_SKIPPED
+    
+    return await category_validator_service.validate_category(
+        image_url,
+        request.category,
+        request.description
+    )
+
+
+# Check statuses bound once for identity comparisons in the aggregation loop
+_SKIPPED = CheckStatus.SKIPPED
+_FAILED = CheckStatus.FAILED
+_WARNING = CheckStatus.WARNING
+
+# Fetches the always-present checks in one call
+_GET_CHECKS = attrgetter(
+    "fake_detection",
+    "duplicate_detection",
+    "metadata_validation",
+    "location_consistency",
+    "category_relevance"
+)
+
+
 def _calculate_overall_result(checks: VerificationChecks) -> tuple:
     """
     Calculate overall verification result
@@ -475,39 +616,39 @@ def _calculate_overall_result(checks: VerificationChecks) -> tuple:
         (confidence_score, status, rejection_reasons, warnings)
     """
     # Collect all check results
-    all_checks = [
-        checks.fake_detection,
-        checks.duplicate_detection,
-        checks.metadata_validation,
-        checks.location_consistency,
-        checks.category_relevance
-    ]
+    all_checks = list(_GET_CHECKS(checks))
     
     if checks.internet_search:
         all_checks.append(checks.internet_search)
     
-    # Filter out skipped checks
-    active_checks = [c for c in all_checks if c.status != CheckStatus.SKIPPED]
+    # Single pass over the checks, skipping those not performed
+    confidence_total = 0.0
+    active_count = 0
+    rejection_reasons = []
+    warnings = []
+    for check in all_checks:
+        status = check.status
+        if status is _SKIPPED:
+            continue
+        confidence_total += check.confidence
+        active_count += 1
+        if status is _FAILED:
+            rejection_reasons.append(check.details)
+        elif status is _WARNING:
+            warnings.append(check.details)
     
-    if not active_checks:
+    if not active_count:
         return 0.5, VerificationStatus.NEEDS_REVIEW, ["No checks performed"], []
     
     # Calculate average confidence
-    confidence_score = sum(c.confidence for c in active_checks) / len(active_checks)
-    
-    # Collect failures and warnings
-    failures = [c for c in active_checks if c.status == CheckStatus.FAILED]
-    warnings_list = [c for c in active_checks if c.status == CheckStatus.WARNING]
-    
-    rejection_reasons = [c.details for c in failures]
-    warnings = [c.details for c in warnings_list]
+    confidence_score = confidence_total / active_count
     
     # Determine status
-    if failures:
+    if rejection_reasons:
         status = VerificationStatus.REJECTED
-    elif confidence_score >= settings.auto_approve_threshold:
+    elif confidence_score >= AUTO_APPROVE_THRESHOLD:
         status = VerificationStatus.APPROVED
-    elif confidence_score <= settings.auto_reject_threshold:
+    elif confidence_score <= AUTO_REJECT_THRESHOLD:
         status = VerificationStatus.REJECTED
     else:
         status = VerificationStatus.NEEDS_REVIEW
@@ -526,15 +667,20 @@ async def root():
         "service": "CivicFix AI Verification Service",
         "version": "1.0.0",
         "status": "running",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
 
 if __name__ == "__main__":
     import uvicorn
+    # Auto-reload only in debug, where it needs a single worker
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=settings.service_port,
-        reload=settings.debug
+        # "auto" prefers uvloop and httptools when installed; uvloop has no Windows build
+        loop="auto",
+        http="auto",
+        reload=settings.debug,
+        workers=1 if settings.debug else settings.workers
     )
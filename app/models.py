@@ -2,9 +2,9 @@
 Pydantic models for AI Verification Service
 """
 
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 
 
@@ -46,7 +46,7 @@ class LocationData(BaseModel):
 class InitialVerificationRequest(BaseModel):
     """Request for initial issue verification"""
     issue_id: int
-    image_urls: List[str] = Field(..., min_items=1, max_items=10)
+    image_urls: List[str] = Field(..., min_length=1, max_length=10)
     category: str
     location: LocationData
     description: str
@@ -56,8 +56,8 @@ class InitialVerificationRequest(BaseModel):
 class CrossVerificationRequest(BaseModel):
     """Request for cross-verification (citizen vs government)"""
     issue_id: int
-    citizen_images: List[str] = Field(..., min_items=1)
-    government_images: List[str] = Field(..., min_items=1)
+    citizen_images: List[str] = Field(..., min_length=1)
+    government_images: List[str] = Field(..., min_length=1)
     location: LocationData
     issue_category: str
     metadata: Optional[Dict[str, Any]] = None
@@ -75,6 +75,8 @@ class RevalidationRequest(BaseModel):
 
 class CheckResult(BaseModel):
     """Result of an individual check"""
+    model_config = ConfigDict(frozen=True)
+    
     status: CheckStatus
     confidence: float = Field(..., ge=0, le=1)
     details: Optional[str] = None
@@ -83,6 +85,8 @@ class CheckResult(BaseModel):
 
 class VerificationChecks(BaseModel):
     """All verification checks performed"""
+    model_config = ConfigDict(frozen=True)
+    
     fake_detection: CheckResult
     duplicate_detection: CheckResult
     metadata_validation: CheckResult
@@ -100,7 +104,7 @@ class InitialVerificationResponse(BaseModel):
     rejection_reasons: List[str] = []
     warnings: List[str] = []
     processing_time_ms: int
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
 class CrossVerificationResponse(BaseModel):
@@ -114,7 +118,7 @@ class CrossVerificationResponse(BaseModel):
     notes: str
     warnings: List[str] = []
     processing_time_ms: int
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
 class VerificationStatusResponse(BaseModel):
@@ -165,7 +169,7 @@ class HealthResponse(BaseModel):
     """Health check response"""
     status: str
     version: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     services: Dict[str, str]
 
 
@@ -0,0 +1,15 @@
+"""
+Pillow Configuration
+
+Services that open downloaded images import Image from here, so the
+decompression bomb limit is applied before any image is opened.
+"""
+
+from PIL import Image
+
+from app.config import get_settings
+
+# Guard against decompression bombs in untrusted uploads
+Image.MAX_IMAGE_PIXELS = get_settings().max_image_pixels
+
+__all__ = ["Image"]
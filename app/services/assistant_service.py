@@ -65,6 +65,18 @@ class AssistantService:
             'response': "I'm not sure I understood that. I can help with reporting issues, checking status, or explaining the platform.",
             'suggestions': ["Report an issue", "How it works", "Contact support"]
         }
+        
+        # All intents compiled into one regex. Each intent is a lookahead
+        # anchored at the start, so alternatives are tried in declaration
+        # order and the first intent matching anywhere wins.
+        self._intent_re = re.compile(
+            "|".join(
+                f"(?=.*?(?P<{name}>{'|'.join(data['patterns'])}))"
+                for name, data in self.intents.items()
+            ),
+            re.DOTALL
+        )
+        self._greeting_tail = self.intents['greeting']['response'].split('! ', 1)[1]
 
     async def process_chat(self, request: ChatRequest) -> ChatResponse:
         """Process a user message and return a response"""
@@ -72,23 +84,17 @@ class AssistantService:
             message = request.message.lower().strip()
             
             # Simple keyword matching
-            matched_intent = None
-            
-            for intent_name, data in self.intents.items():
-                for pattern in data['patterns']:
-                    if re.search(pattern, message):
-                        matched_intent = data
-                        break
-                if matched_intent:
-                    break
+            match = self._intent_re.match(message)
             
-            if matched_intent:
+            if match:
+                intent_name = match.lastgroup
+                matched_intent = self.intents[intent_name]
                 response = matched_intent['response']
                 suggestions = matched_intent['suggestions']
                 
                 # Personalize if possible
                 if request.user_name and intent_name == 'greeting':
-                    response = f"Hello {request.user_name}! " + response.split('! ', 1)[1]
+                    response = f"Hello {request.user_name}! " + self._greeting_tail
                     
                 return ChatResponse(response=response, suggestions=suggestions)
             
@@ -8,18 +8,58 @@ This service validates:
 - Relevance scoring
 """
 
+import asyncio
 import logging
-from typing import Dict, List
-from PIL import Image
-import io
-import httpx
+import re
+import string
+import time
+import hashlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Tuple
 
 from app.config import get_settings
 from app.models import CheckResult, CheckStatus
+from app.services.http_client import download_image
+
+if TYPE_CHECKING:
+    import numpy as np
+
+try:
+    import ahocorasick
+except ImportError:  # Optional: fall back to set intersection
+    ahocorasick = None
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+except ImportError:  # Optional: fall back to Pillow for JPEG decoding
+    TurboJPEG = None
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Descriptions are matched against keywords word by word
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Images are decoded at no less than this size on their shorter side
+_DECODE_MIN_SIZE = 512
+_JPEG_MAGIC = b"\xff\xd8\xff"
+
+# Share of category keywords a description must match to pass, or to warn
+_PASS_MATCH_RATIO = 0.2
+_WARN_MATCH_RATIO = 0.1
+
+# Static results, built once since CheckResult is immutable
+_DOWNLOAD_FAILED = CheckResult(
+    status=CheckStatus.WARNING,
+    confidence=0.5,
+    details="Failed to download image for category validation"
+)
+_MODEL_NOT_LOADED = CheckResult(
+    status=CheckStatus.SKIPPED,
+    confidence=0.0,
+    details="Category classification model not loaded"
+)
+
 
 class CategoryValidatorService:
     """Service for validating issue category relevance"""
@@ -76,13 +116,34 @@ class CategoryValidatorService:
         ]
     }
     
+    # Maximum category validations running at once in batch_validate
+    MAX_CONCURRENT_VALIDATIONS = 8
+    
+    # Keyword sets for hash lookups, built once at class creation
+    CATEGORY_KEYWORD_SETS: Dict[str, FrozenSet[str]] = {
+        category: frozenset(keywords) for category, keywords in CATEGORY_KEYWORDS.items()
+    }
+    
     def __init__(self):
         self.settings = settings
         self.model_loaded = False
+        # LRU cache of results keyed by (image_url, category, description hash, TTL bucket)
+        self.result_cache: "OrderedDict[Tuple, CheckResult]" = OrderedDict()
+        self._jpeg_decoder = self._create_jpeg_decoder()
         
         if not settings.enable_mock_ai:
             self._load_model()
     
+    def _create_jpeg_decoder(self) -> Optional["TurboJPEG"]:
+        """Create a libjpeg-turbo decoder if PyTurboJPEG and its library are available"""
+        if TurboJPEG is None:
+            return None
+        try:
+            return TurboJPEG()
+        except RuntimeError as e:
+            logger.warning(f"libjpeg-turbo not available, decoding with Pillow: {e}")
+            return None
+    
     def _load_model(self):
         """Load category classification model"""
         try:
@@ -111,26 +172,36 @@ class CategoryValidatorService:
         Returns:
             CheckResult with validation status
         """
+        # Bypass the cache for a loaded model so results reflect model reloads
+        use_cache = settings.enable_mock_ai or not self.model_loaded
+        if use_cache:
+            cache_key = self._cache_key(image_url, category, description)
+            cached = self._get_cached_result(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
             # Download image
-            image_data = await self._download_image(image_url)
+            image_data = await download_image(image_url)
             if not image_data:
-                return CheckResult(
-                    status=CheckStatus.WARNING,
-                    confidence=0.5,
-                    details="Failed to download image for category validation"
-                )
-            
-            # Open image
-            image = Image.open(io.BytesIO(image_data))
+                return _DOWNLOAD_FAILED
             
             if settings.enable_mock_ai:
-                # Mock validation using heuristics
-                result = self._mock_validation(image, category, description)
+                # Mock validation only looks at the description, so the
+                # image is never decoded
+                result = self._mock_validation(None, category, description)
             else:
+                # Decoding is CPU-bound, so it runs off the event loop
+                image = await asyncio.to_thread(
+                    _decode_image, image_data, self._jpeg_decoder
+                )
+                
                 # Real AI validation
                 result = self._real_validation(image, category, description)
             
+            if use_cache:
+                self._store_cached_result(cache_key, result)
+            
             return result
             
         except Exception as e:
@@ -143,7 +214,7 @@ class CategoryValidatorService:
     
     def _mock_validation(
         self,
-        image: Image.Image,
+        image: Optional["np.ndarray"],
         category: str,
         description: str
     ) -> CheckResult:
@@ -153,7 +224,7 @@ class CategoryValidatorService:
         Checks if description contains keywords related to the category
         """
         # Get keywords for category
-        keywords = self.CATEGORY_KEYWORDS.get(category, [])
+        keywords = self.CATEGORY_KEYWORD_SETS.get(category)
         
         if not keywords:
             # Unknown category
@@ -164,18 +235,19 @@ class CategoryValidatorService:
                 metadata={"category": category}
             )
         
-        # Check description for keywords
-        description_lower = description.lower()
-        matches = [kw for kw in keywords if kw in description_lower]
+        # Check description for whole-word keyword matches. The description
+        # is lowercased once here; an ASCII bytes.translate path measured no
+        # faster than str.lower and would not feed the str-based automaton
+        matches = sorted(self._match_keywords(category, keywords, description.lower()))
         
         # Calculate confidence based on keyword matches
-        match_ratio = len(matches) / len(keywords) if keywords else 0
+        match_ratio = len(matches) / len(keywords)
         confidence = 0.5 + (match_ratio * 0.5)  # 0.5 to 1.0 range
         
-        if match_ratio >= 0.2:  # At least 20% keywords match
+        if match_ratio >= _PASS_MATCH_RATIO:
             status = CheckStatus.PASSED
             details = f"Category '{category}' appears relevant. Matched keywords: {', '.join(matches[:5])}"
-        elif match_ratio >= 0.1:  # 10-20% match
+        elif match_ratio >= _WARN_MATCH_RATIO:
             status = CheckStatus.WARNING
             details = f"Category '{category}' may be relevant but confidence is low. Matched: {', '.join(matches)}"
         else:
@@ -193,9 +265,37 @@ class CategoryValidatorService:
             }
         )
     
+    def _match_keywords(
+        self,
+        category: str,
+        keywords: FrozenSet[str],
+        text: str
+    ) -> FrozenSet[str]:
+        """
+        Find category keywords occurring as whole words in text
+        
+        Uses a single Aho-Corasick pass when pyahocorasick is installed,
+        otherwise intersects the keyword set with the text's words.
+        """
+        if _KEYWORD_AUTOMATON is None:
+            return keywords & frozenset(_WORD_RE.findall(text))
+        
+        matches = set()
+        for end, (categories, keyword) in _KEYWORD_AUTOMATON.iter(text):
+            if category not in categories:
+                continue
+            start = end - len(keyword) + 1
+            # Reject hits embedded in a longer word
+            if start > 0 and text[start - 1] in string.ascii_lowercase:
+                continue
+            if end + 1 < len(text) and text[end + 1] in string.ascii_lowercase:
+                continue
+            matches.add(keyword)
+        return frozenset(matches)
+    
     def _real_validation(
         self,
-        image: Image.Image,
+        image: "np.ndarray",
         category: str,
         description: str
     ) -> CheckResult:
@@ -208,11 +308,7 @@ class CategoryValidatorService:
         - Multi-modal fusion
         """
         if not self.model_loaded:
-            return CheckResult(
-                status=CheckStatus.SKIPPED,
-                confidence=0.0,
-                details="Category classification model not loaded"
-            )
+            return _MODEL_NOT_LOADED
         
         try:
             # TODO: Implement real model inference
@@ -233,17 +329,109 @@ class CategoryValidatorService:
                 details=f"Model inference failed: {str(e)}"
             )
     
-    async def _download_image(self, image_url: str) -> bytes:
-        """Download image from URL"""
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(image_url)
-                response.raise_for_status()
-                return response.content
-        except Exception as e:
-            logger.error(f"Failed to download image from {image_url}: {e}")
-            return None
+    async def batch_validate(
+        self,
+        image_urls: List[str],
+        category: str,
+        description: str
+    ) -> List[CheckResult]:
+        """
+        Validate category for multiple images concurrently
+        
+        Args:
+            image_urls: List of image URLs
+            category: Reported issue category
+            description: Issue description
+            
+        Returns:
+            List of CheckResult objects, in input order
+        """
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_VALIDATIONS)
+        
+        async def validate(url: str) -> CheckResult:
+            async with semaphore:
+                return await self.validate_category(url, category, description)
+        
+        return await asyncio.gather(*(validate(url) for url in image_urls))
+    
+    def _cache_key(self, image_url: str, category: str, description: str) -> Tuple:
+        """Build a result cache key; the time bucket makes entries expire"""
+        description_hash = hashlib.blake2b(description.encode(), digest_size=8).digest()
+        ttl_bucket = int(time.monotonic() // settings.category_cache_ttl_seconds)
+        return (image_url, category, description_hash, ttl_bucket)
+    
+    def _get_cached_result(self, key: Tuple) -> Optional[CheckResult]:
+        """Get a cached result, marking it as recently used"""
+        result = self.result_cache.get(key)
+        if result is not None:
+            self.result_cache.move_to_end(key)
+        return result
+    
+    def _store_cached_result(self, key: Tuple, result: CheckResult):
+        """Cache a result, evicting the least recently used entries"""
+        cache = self.result_cache
+        max_size = settings.category_cache_size
+        cache[key] = result
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+    
+    def clear_cache(self):
+        """Clear result cache (for testing)"""
+        self.result_cache.clear()
     
     def get_supported_categories(self) -> List[str]:
         """Get list of supported categories"""
         return list(self.CATEGORY_KEYWORDS.keys())
+
+
+def _decode_image(
+    image_data: bytes,
+    jpeg_decoder: Optional["TurboJPEG"] = None
+) -> "np.ndarray":
+    """
+    Decode image bytes to an RGB array, downscaling while decoding
+    
+    JPEGs go straight to libjpeg-turbo when available; everything else
+    goes through Pillow.
+    """
+    if jpeg_decoder is not None and image_data[:3] == _JPEG_MAGIC:
+        width, height = jpeg_decoder.decode_header(image_data)[:2]
+        scale = 1
+        while scale < 8 and min(width, height) // (scale * 2) >= _DECODE_MIN_SIZE:
+            scale *= 2
+        return jpeg_decoder.decode(
+            image_data,
+            pixel_format=TJPF_RGB,
+            scaling_factor=(1, scale)
+        )
+    
+    # Pillow and NumPy are only needed for real validation, import them on first use
+    import io
+    import numpy as np
+    from app.services._pil import Image
+    
+    image = Image.open(io.BytesIO(image_data))
+    image.draft("RGB", (_DECODE_MIN_SIZE, _DECODE_MIN_SIZE))
+    return np.asarray(image.convert("RGB"))
+
+
+def _build_keyword_automaton():
+    """Build one automaton over all category keywords, tagged by category"""
+    if ahocorasick is None:
+        return None
+    
+    # Keywords shared by several categories map to all of them
+    categories_by_keyword: Dict[str, set] = {}
+    for category, keywords in CategoryValidatorService.CATEGORY_KEYWORD_SETS.items():
+        for keyword in keywords:
+            categories_by_keyword.setdefault(keyword, set()).add(category)
+    
+    automaton = ahocorasick.Automaton()
+    for keyword, categories in categories_by_keyword.items():
+        automaton.add_word(keyword, (frozenset(categories), keyword))
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
@@ -8,22 +8,61 @@ This service compares citizen "before" images with government "after" images to
 - Fake resolution detection
 """
 
+import asyncio
 import logging
 from typing import List, Tuple
-from PIL import Image
-import imagehash
+from app.services._pil import Image
 import io
-import httpx
+import cv2
 import numpy as np
 
 from app.config import get_settings
 from app.models import CheckResult, CheckStatus, LocationData, ComparisonResult
+from app.services.duplicate_detection import HASH_BITS, calculate_phash, to_grayscale
+from app.services.http_client import download_image
 from app.services.location_validator import LocationValidatorService
 from app.services.metadata_validator import MetadataValidatorService
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Work completion compares 256x256 grayscale images as an 8x8 grid of 32x32 tiles
+_COMPARE_SIZE = 256
+_TILE_SIZE = 32
+
+# A tile has changed when its mean SSIM drops below 1 - this; work is
+# considered done when more than this fraction of tiles changed
+_TILE_CHANGE_THRESHOLD = 0.2
+_CHANGED_TILE_FRACTION = 0.15
+
+# SSIM stabilizing constants for 8-bit images
+_SSIM_C1 = (0.01 * 255) ** 2
+_SSIM_C2 = (0.03 * 255) ** 2
+
+
+def _ssim_map(before: np.ndarray, after: np.ndarray) -> np.ndarray:
+    """Per-pixel structural similarity of two grayscale images (7x7 Gaussian window)"""
+    before = before.astype(np.float32)
+    after = after.astype(np.float32)
+    
+    def blur(x: np.ndarray) -> np.ndarray:
+        return cv2.GaussianBlur(x, (7, 7), 1.5)
+    
+    mu_before = blur(before)
+    mu_after = blur(after)
+    mu_before_sq = mu_before * mu_before
+    mu_after_sq = mu_after * mu_after
+    mu_product = mu_before * mu_after
+    
+    var_before = blur(before * before) - mu_before_sq
+    var_after = blur(after * after) - mu_after_sq
+    covariance = blur(before * after) - mu_product
+    
+    return (
+        (2 * mu_product + _SSIM_C1) * (2 * covariance + _SSIM_C2)
+        / ((mu_before_sq + mu_after_sq + _SSIM_C1) * (var_before + var_after + _SSIM_C2))
+    )
+
 
 class CrossVerificationService:
     """Service for cross-verifying citizen vs government images"""
@@ -54,8 +93,10 @@ class CrossVerificationService:
         """
         try:
             # Download and analyze images
-            citizen_imgs = await self._download_images(citizen_images)
-            government_imgs = await self._download_images(government_images)
+            citizen_imgs, government_imgs = await asyncio.gather(
+                self._download_images(citizen_images),
+                self._download_images(government_images)
+            )
             
             if not citizen_imgs or not government_imgs:
                 return ComparisonResult(
@@ -68,21 +109,25 @@ class CrossVerificationService:
                     warnings=["Image download failed"]
                 )
             
-            # Check 1: Location consistency
-            location_check = await self._verify_location_consistency(
-                citizen_images[0],
-                government_images[0],
+            # Check 1: Location consistency, reusing the downloaded images
+            location_check = self._verify_location_consistency(
+                citizen_imgs[0],
+                government_imgs[0],
                 location
             )
             
-            # Check 2: Image similarity (should be similar location but different state)
-            similarity_score = self._calculate_similarity(
+            # Check 2: Image similarity (should be similar location but different state).
+            # Decoding and hashing are CPU-bound, so they run on a worker thread
+            similarity_score = await asyncio.to_thread(
+                self._calculate_similarity,
                 citizen_imgs[0],
                 government_imgs[0]
             )
             
-            # Check 3: Visual change detection
-            work_completed = self._detect_work_completion(
+            # Check 3: Visual change detection, after check 2 so the shared
+            # images are never decoded from two threads at once
+            work_completed = await asyncio.to_thread(
+                self._detect_work_completion,
                 citizen_imgs[0],
                 government_imgs[0],
                 issue_category
@@ -104,8 +149,9 @@ class CrossVerificationService:
             )
             
             # Collect warnings
+            same_location = location_check["same_location"]
             warnings = []
-            if not location_check["same_location"]:
+            if not same_location:
                 warnings.append("Location mismatch detected")
             if similarity_score < 0.3:
                 warnings.append("Images appear to be from different locations")
@@ -114,7 +160,7 @@ class CrossVerificationService:
             
             return ComparisonResult(
                 similarity_score=similarity_score,
-                same_location=location_check["same_location"],
+                same_location=same_location,
                 location_distance_meters=location_check["distance"],
                 work_appears_completed=work_completed,
                 confidence=confidence,
@@ -134,21 +180,15 @@ class CrossVerificationService:
                 warnings=["Verification failed"]
             )
     
-    async def _verify_location_consistency(
+    def _verify_location_consistency(
         self,
-        citizen_image_url: str,
-        government_image_url: str,
+        citizen_img: Image.Image,
+        government_img: Image.Image,
         reported_location: LocationData
     ) -> dict:
         """Verify both images are from the same location"""
         try:
             # Extract GPS from both images
-            citizen_img_data = await self._download_image(citizen_image_url)
-            government_img_data = await self._download_image(government_image_url)
-            
-            citizen_img = Image.open(io.BytesIO(citizen_img_data))
-            government_img = Image.open(io.BytesIO(government_img_data))
-            
             citizen_exif = self.metadata_service._extract_exif(citizen_img)
             government_exif = self.metadata_service._extract_exif(government_img)
             
@@ -194,15 +234,14 @@ class CrossVerificationService:
         """
         try:
             # Calculate perceptual hashes
-            hash1 = imagehash.phash(img1, hash_size=16)
-            hash2 = imagehash.phash(img2, hash_size=16)
+            hash1 = calculate_phash(img1)
+            hash2 = calculate_phash(img2)
             
             # Calculate Hamming distance
-            distance = hash1 - hash2
+            distance = (hash1 ^ hash2).bit_count()
             
             # Convert to similarity (0-1 scale)
-            max_distance = 256  # 16x16 hash
-            similarity = 1 - (distance / max_distance)
+            similarity = 1 - (distance / HASH_BITS)
             
             return similarity
             
@@ -225,28 +264,30 @@ class CrossVerificationService:
         - Change detection algorithms
         """
         try:
-            # Convert images to grayscale for comparison
-            before_gray = before_img.convert('L')
-            after_gray = after_img.convert('L')
-            
-            # Resize to same size
-            size = (256, 256)
-            before_gray = before_gray.resize(size)
-            after_gray = after_gray.resize(size)
-            
-            # Convert to numpy arrays
-            before_array = np.array(before_gray)
-            after_array = np.array(after_gray)
+            # Grayscale and shrink to a common size on uint8
+            size = (_COMPARE_SIZE, _COMPARE_SIZE)
+            before_array = cv2.resize(
+                np.asarray(to_grayscale(before_img)), size, interpolation=cv2.INTER_AREA
+            )
+            after_array = cv2.resize(
+                np.asarray(to_grayscale(after_img)), size, interpolation=cv2.INTER_AREA
+            )
             
-            # Calculate difference
-            diff = np.abs(before_array.astype(float) - after_array.astype(float))
-            mean_diff = np.mean(diff)
+            # Structural similarity averaged per tile; unlike a raw pixel diff
+            # this is largely insensitive to lighting and time-of-day changes
+            tiles_per_side = _COMPARE_SIZE // _TILE_SIZE
+            tile_ssim = _ssim_map(before_array, after_array).reshape(
+                tiles_per_side, _TILE_SIZE, tiles_per_side, _TILE_SIZE
+            ).mean(axis=(1, 3))
+            changed_fraction = float(((1 - tile_ssim) > _TILE_CHANGE_THRESHOLD).mean())
             
-            # Heuristic: If mean difference is significant, work was done
+            # Heuristic: If enough of the scene changed structurally, work was done
             # This is very simplified - real implementation would use ML
-            work_done = mean_diff > 20  # Threshold for "significant change"
+            work_done = changed_fraction > _CHANGED_TILE_FRACTION
             
-            logger.info(f"Work completion detection: mean_diff={mean_diff:.2f}, work_done={work_done}")
+            logger.info(
+                f"Work completion detection: changed_tiles={changed_fraction:.2%}, work_done={work_done}"
+            )
             
             return work_done
             
@@ -308,20 +349,14 @@ class CrossVerificationService:
     
     async def _download_images(self, image_urls: List[str]) -> List[Image.Image]:
         """Download multiple images"""
-        images = []
-        for url in image_urls:
-            img_data = await self._download_image(url)
-            if img_data:
-                images.append(Image.open(io.BytesIO(img_data)))
+        images_data = await asyncio.gather(*(download_image(url) for url in image_urls))
+        images = [
+            Image.open(io.BytesIO(img_data))
+            for img_data in images_data
+            if img_data
+        ]
+        # Comparisons work on small grayscale images, so let libjpeg decode at
+        # reduced scale; EXIF is read from the header and is unaffected
+        for image in images:
+            image.draft('L', (256, 256))
         return images
-    
-    async def _download_image(self, image_url: str) -> bytes:
-        """Download single image"""
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(image_url)
-                response.raise_for_status()
-                return response.content
-        except Exception as e:
-            logger.error(f"Failed to download image from {image_url}: {e}")
-            return None
@@ -8,27 +8,151 @@ This service detects:
 - Reused images across issues
 """
 
+import asyncio
 import logging
-from typing import Tuple, List, Optional
-from PIL import Image
-import imagehash
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple, List, Optional, Union
+from app.services._pil import Image
 import io
-import httpx
+import numpy as np
 
 from app.config import get_settings
+from app.cache import redis_client
 from app.models import CheckResult, CheckStatus
+from app.services.http_client import download_image
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Returned for every image that could not be downloaded
+_DOWNLOAD_FAILED = CheckResult(
+    status=CheckStatus.FAILED,
+    confidence=0.0,
+    details="Failed to download image"
+)
+
+# Hash size; 8x8 gives a 64-bit hash that fits in a single int
+HASH_SIZE = 8
+HASH_BITS = HASH_SIZE * HASH_SIZE
+
+
+# Stored in place of a missing issue ID in the issue ID array
+_NO_ISSUE = -1
+_INITIAL_CACHE_CAPACITY = 1024
+
+# Redis hash holding every stored image dHash (hex) -> issue ID
+HASH_CACHE_KEY = "image_dhashes"
+
+
+# pHash input size and the low-frequency rows of the DCT-II basis for it.
+# The basis is unnormalized like scipy's DCT; scaling does not change which
+# coefficients lie above the median
+_PHASH_IMAGE_SIZE = HASH_SIZE * 4
+_DCT_LOW = np.cos(
+    np.pi
+    * np.outer(np.arange(HASH_SIZE), 2 * np.arange(_PHASH_IMAGE_SIZE) + 1)
+    / (2 * _PHASH_IMAGE_SIZE)
+)
+
+
+def to_grayscale(image: Image.Image) -> Image.Image:
+    """Convert an image to 8-bit grayscale, without copying one that already is"""
+    if image.mode == 'L':
+        return image
+    return image.convert('L')
+
+
+def calculate_phash(image: Image.Image) -> int:
+    """
+    Calculate the 64-bit perceptual hash of an image as an int
+    
+    Produces the same bits as imagehash.phash(image, hash_size=8), computing
+    only the 8x8 low-frequency DCT block with two small matrix products.
+    Packed into an int, distance is one XOR + popcount.
+    """
+    image = to_grayscale(image).resize((_PHASH_IMAGE_SIZE, _PHASH_IMAGE_SIZE), Image.LANCZOS)
+    pixels = np.asarray(image, dtype=np.float64)
+    
+    low_freq = _DCT_LOW @ pixels @ _DCT_LOW.T
+    bits = low_freq > np.median(low_freq)
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def calculate_dhash(image: Image.Image) -> int:
+    """
+    Calculate the 64-bit horizontal difference hash of an image as an int
+    
+    Produces the same bits as imagehash.dhash(image, hash_size=8): each bit
+    records whether a pixel of the 9x8 grayscale thumbnail is brighter than
+    its right-hand neighbour.
+    """
+    image = to_grayscale(image).resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+    pixels = np.asarray(image)
+    
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Number of set bits in each element of a uint64 array"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return _popcount_swar(values)
+
+
+def _popcount_swar(values: np.ndarray) -> np.ndarray:
+    """Bit count by SWAR, for NumPy releases without bitwise_count"""
+    x = values - ((values >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return (x * _H01) >> np.uint64(56)
+
+
+def hamming_distances(hashes: np.ndarray, image_hash: int) -> np.ndarray:
+    """Hamming distance of each stored hash to image_hash"""
+    return _popcount(hashes ^ np.uint64(image_hash))
+
+
+def max_hamming_distance(threshold: float) -> int:
+    """
+    Largest Hamming distance whose similarity (1 - distance / HASH_BITS)
+    still meets threshold
+    
+    Lets scans compare integer distances instead of computing a float
+    similarity for every stored hash.
+    """
+    similarities = 1 - np.arange(HASH_BITS + 1) / HASH_BITS
+    return int(np.count_nonzero(similarities >= threshold)) - 1
+
 
 class DuplicateDetectionService:
     """Service for detecting duplicate images"""
     
+    # Maximum downloads and hashes running at once in batch_detect
+    MAX_CONCURRENT_HASHES = 8
+    
     def __init__(self):
         self.settings = settings
-        # In-memory cache of image hashes (in production, use Redis or database)
-        self.hash_cache = {}
+        # In-memory cache of image hashes, persisted to Redis when available.
+        # Hashes and issue IDs live in parallel arrays so a check scans them
+        # in one vectorized pass; hash_cache maps each hash to its row.
+        self.hash_cache: Dict[int, int] = {}
+        self._hashes = np.empty(_INITIAL_CACHE_CAPACITY, dtype=np.uint64)
+        self._issue_ids = np.empty(_INITIAL_CACHE_CAPACITY, dtype=np.int64)
+        # Hashes stored since the last write to Redis
+        self._unsaved_hashes: Dict[int, int] = {}
+        # When hashes were last loaded from Redis (monotonic time)
+        self._hashes_loaded_at: Optional[float] = None
+        # LRU cache of recently hashed URLs, as (expiry time, hash)
+        self.url_hash_cache: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self.redis = redis_client
     
     async def detect_duplicate(
         self,
@@ -45,51 +169,37 @@ class DuplicateDetectionService:
         Returns:
             CheckResult with duplicate detection status
         """
+        image_hash = await self._hash_image(image_url)
+        if isinstance(image_hash, CheckResult):
+            return image_hash
+        await self._sync_hashes([image_hash])
+        result = self._check_hash(image_hash, issue_id)
+        await self.save_hashes()
+        return result
+    
+    async def _hash_image(
+        self,
+        image_url: str
+    ) -> Union[int, CheckResult]:
+        """
+        Download an image and compute its perceptual hash off the event loop
+        
+        Returns:
+            The hash, or a FAILED CheckResult if download or hashing failed
+        """
+        image_hash = self._get_cached_hash(image_url)
+        if image_hash is not None:
+            return image_hash
+        
+        # Download image
+        image_data = await download_image(image_url)
+        if not image_data:
+            return _DOWNLOAD_FAILED
+        
         try:
-            # Download image
-            image_data = await self._download_image(image_url)
-            if not image_data:
-                return CheckResult(
-                    status=CheckStatus.FAILED,
-                    confidence=0.0,
-                    details="Failed to download image"
-                )
-            
-            # Open image
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Calculate perceptual hash
-            phash = self._calculate_phash(image)
-            
-            # Check for duplicates
-            duplicate_found, similarity, duplicate_issue_id = self._check_duplicates(
-                phash,
-                issue_id
-            )
-            
-            if duplicate_found:
-                return CheckResult(
-                    status=CheckStatus.FAILED,
-                    confidence=similarity,
-                    details=f"Duplicate image detected (similarity: {similarity:.2%}). "
-                           f"Previously used in issue #{duplicate_issue_id}",
-                    metadata={
-                        "duplicate_issue_id": duplicate_issue_id,
-                        "similarity_score": similarity,
-                        "hash": str(phash)
-                    }
-                )
-            else:
-                # Store hash for future checks
-                self._store_hash(phash, issue_id)
-                
-                return CheckResult(
-                    status=CheckStatus.PASSED,
-                    confidence=0.95,
-                    details="No duplicate detected",
-                    metadata={"hash": str(phash)}
-                )
-                
+            image_hash = await asyncio.to_thread(self._hash_image_data, image_data)
+            self._store_cached_hash(image_url, image_hash)
+            return image_hash
         except Exception as e:
             logger.error(f"Duplicate detection failed: {e}")
             return CheckResult(
@@ -98,21 +208,92 @@ class DuplicateDetectionService:
                 details=f"Detection error: {str(e)}"
             )
     
-    def _calculate_phash(self, image: Image.Image) -> imagehash.ImageHash:
+    def _get_cached_hash(self, image_url: str) -> Optional[int]:
+        """Get the cached hash of a URL, marking it as recently used"""
+        entry = self.url_hash_cache.get(image_url)
+        if entry is None:
+            return None
+        
+        expires_at, image_hash = entry
+        if expires_at < time.monotonic():
+            del self.url_hash_cache[image_url]
+            return None
+        
+        self.url_hash_cache.move_to_end(image_url)
+        return image_hash
+    
+    def _store_cached_hash(self, image_url: str, image_hash: int):
+        """Cache the hash of a URL, evicting the least recently used beyond the size limit"""
+        max_size = settings.image_cache_size
+        if max_size <= 0:
+            return
+        
+        cache = self.url_hash_cache
+        cache[image_url] = (time.monotonic() + settings.image_cache_ttl_seconds, image_hash)
+        cache.move_to_end(image_url)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+    
+    def _hash_image_data(self, image_data: bytes) -> int:
+        """Decode image bytes and calculate their perceptual hash"""
+        image = Image.open(io.BytesIO(image_data))
+        # The hash only needs a small grayscale image, so let libjpeg decode at reduced scale
+        image.draft('L', (256, 256))
+        return self._calculate_hash(image)
+    
+    def _check_hash(
+        self,
+        image_hash: int,
+        issue_id: Optional[int]
+    ) -> CheckResult:
+        """Check a hash against stored hashes, storing it if it is new"""
+        # Check for duplicates
+        duplicate_found, similarity, duplicate_issue_id = self._check_duplicates(
+            image_hash,
+            issue_id
+        )
+        
+        if duplicate_found:
+            return CheckResult(
+                status=CheckStatus.FAILED,
+                confidence=similarity,
+                details=f"Duplicate image detected (similarity: {similarity:.2%}). "
+                       f"Previously used in issue #{duplicate_issue_id}",
+                metadata={
+                    "duplicate_issue_id": duplicate_issue_id,
+                    "similarity_score": similarity,
+                    "hash": f"{image_hash:016x}"
+                }
+            )
+        
+        # Store hash for future checks
+        self._store_hash(image_hash, issue_id)
+        
+        return CheckResult(
+            status=CheckStatus.PASSED,
+            confidence=0.95,
+            details="No duplicate detected",
+            metadata={"hash": f"{image_hash:016x}"}
+        )
+    
+    def _calculate_hash(self, image: Image.Image) -> int:
         """
-        Calculate perceptual hash of image
+        Calculate difference hash of image
         
-        Uses pHash algorithm which is robust to:
+        Uses dHash, which is robust to:
         - Resizing
         - Compression
         - Minor edits
         - Color adjustments
+        
+        Duplicate checks only need to catch near-exact reuse, so the cheaper
+        dHash is used here; cross-verification keeps pHash.
         """
-        return imagehash.phash(image, hash_size=16)
+        return calculate_dhash(image)
     
     def _check_duplicates(
         self,
-        phash: imagehash.ImageHash,
+        image_hash: int,
         current_issue_id: Optional[int]
     ) -> Tuple[bool, float, Optional[int]]:
         """
@@ -121,45 +302,144 @@ class DuplicateDetectionService:
         Returns:
             (is_duplicate, similarity_score, duplicate_issue_id)
         """
-        for stored_hash_str, stored_issue_id in self.hash_cache.items():
-            # Skip if same issue
-            if current_issue_id and stored_issue_id == current_issue_id:
-                continue
-            
-            stored_hash = imagehash.hex_to_hash(stored_hash_str)
-            
-            # Calculate Hamming distance
-            distance = phash - stored_hash
-            
-            # Convert distance to similarity (0-1 scale)
-            # Hash size is 16, so max distance is 16*16 = 256
-            max_distance = 256
-            similarity = 1 - (distance / max_distance)
-            
-            # Check if similarity exceeds threshold
-            if similarity >= settings.duplicate_threshold:
-                return True, similarity, stored_issue_id
+        count = len(self.hash_cache)
+        if not count:
+            return False, 0.0, None
+        
+        threshold = settings.duplicate_threshold
+        
+        stored_issue_ids = self._issue_ids[:count]
+        
+        # An exact resubmission is found by dict lookup, without scanning
+        row = self.hash_cache.get(image_hash)
+        if row is not None:
+            stored_issue_id = int(stored_issue_ids[row])
+            if not current_issue_id or stored_issue_id != current_issue_id:
+                return True, 1.0, None if stored_issue_id == _NO_ISSUE else stored_issue_id
+        
+        # Hamming distance to every stored hash at once
+        distances = hamming_distances(self._hashes[:count], image_hash)
+        
+        # Check if similarity exceeds threshold, skipping the same issue
+        matches = distances <= max_hamming_distance(threshold)
+        if current_issue_id:
+            matches &= stored_issue_ids != current_issue_id
         
-        return False, 0.0, None
+        # Report the earliest stored match, as a sequential scan would
+        match_rows = np.flatnonzero(matches)
+        if not match_rows.size:
+            return False, 0.0, None
+        
+        row = match_rows[0]
+        stored_issue_id = int(stored_issue_ids[row])
+        return (
+            True,
+            1 - int(distances[row]) / HASH_BITS,
+            None if stored_issue_id == _NO_ISSUE else stored_issue_id
+        )
     
-    def _store_hash(self, phash: imagehash.ImageHash, issue_id: Optional[int]):
+    def _store_hash(self, image_hash: int, issue_id: Optional[int]):
         """Store hash for future duplicate checks"""
-        self.hash_cache[str(phash)] = issue_id
+        stored_issue_id = _NO_ISSUE if issue_id is None else issue_id
+        self._index_hash(image_hash, stored_issue_id)
+        self._unsaved_hashes[image_hash] = stored_issue_id
+    
+    def _index_hash(self, image_hash: int, stored_issue_id: int):
+        """Add or update a hash in the local arrays, without queueing it for Redis"""
+        row = self.hash_cache.get(image_hash)
+        if row is None:
+            row = len(self.hash_cache)
+            if row == len(self._hashes):
+                self._grow_cache()
+            self._hashes[row] = image_hash
+            self.hash_cache[image_hash] = row
+        
+        self._issue_ids[row] = stored_issue_id
+    
+    async def _sync_hashes(self, image_hashes: List[int]):
+        """
+        Pick up hashes other workers saved to Redis before checking
+        
+        Every worker keeps its own index. Exact matches for image_hashes are
+        fetched from Redis on each check; near matches rely on the full
+        reload every duplicate_hash_refresh_seconds.
+        """
+        if self.redis is None:
+            return
+        
+        loaded_at = self._hashes_loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at >= settings.duplicate_hash_refresh_seconds:
+            await self.load_hashes()
+            return
+        
+        missing = [image_hash for image_hash in set(image_hashes) if image_hash not in self.hash_cache]
+        if not missing:
+            return
+        
+        try:
+            stored = await self.redis.hmget(
+                HASH_CACHE_KEY,
+                [f"{image_hash:016x}" for image_hash in missing]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to look up image hashes in Redis: {e}")
+            return
         
-        # TODO: In production, store in Redis or database
-        # Example:
-        # redis_client.set(f"image_hash:{phash}", issue_id)
+        for image_hash, issue_id in zip(missing, stored):
+            if issue_id is not None:
+                self._index_hash(image_hash, int(issue_id))
     
-    async def _download_image(self, image_url: str) -> bytes:
-        """Download image from URL"""
+    async def load_hashes(self) -> int:
+        """
+        Load hashes persisted in Redis into the local cache
+        
+        Returns:
+            Number of hashes loaded
+        """
+        if self.redis is None:
+            return 0
+        
+        # Stamped up front so an unreachable Redis is retried once per refresh interval
+        self._hashes_loaded_at = time.monotonic()
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(image_url)
-                response.raise_for_status()
-                return response.content
+            stored = await self.redis.hgetall(HASH_CACHE_KEY)
         except Exception as e:
-            logger.error(f"Failed to download image from {image_url}: {e}")
-            return None
+            logger.warning(f"Failed to load image hashes from Redis: {e}")
+            return 0
+        
+        # Hashes stored locally but not yet saved stay queued for the next save
+        for image_hash, issue_id in stored.items():
+            self._index_hash(int(image_hash, 16), int(issue_id))
+        
+        logger.info(f"Loaded {len(stored)} image hashes from Redis")
+        return len(stored)
+    
+    async def save_hashes(self):
+        """Write hashes stored since the last save to Redis"""
+        if self.redis is None or not self._unsaved_hashes:
+            return
+        
+        unsaved, self._unsaved_hashes = self._unsaved_hashes, {}
+        try:
+            await self.redis.hset(
+                HASH_CACHE_KEY,
+                mapping={f"{image_hash:016x}": issue_id for image_hash, issue_id in unsaved.items()}
+            )
+        except Exception as e:
+            logger.warning(f"Failed to save image hashes to Redis: {e}")
+    
+    def _grow_cache(self):
+        """Double the capacity of the hash and issue ID arrays"""
+        capacity = len(self._hashes) * 2
+        count = len(self.hash_cache)
+        
+        hashes = np.empty(capacity, dtype=np.uint64)
+        hashes[:count] = self._hashes[:count]
+        issue_ids = np.empty(capacity, dtype=np.int64)
+        issue_ids[:count] = self._issue_ids[:count]
+        
+        self._hashes = hashes
+        self._issue_ids = issue_ids
     
     async def batch_detect(
         self,
@@ -176,15 +456,30 @@ class DuplicateDetectionService:
         Returns:
             List of CheckResult objects
         """
-        results = []
-        for url in image_urls:
-            result = await self.detect_duplicate(url, issue_id)
-            results.append(result)
+        # Download and hash concurrently, then check hashes in input order so
+        # images within the batch are compared deterministically
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_HASHES)
+        
+        async def hash_image(url: str) -> Union[int, CheckResult]:
+            async with semaphore:
+                return await self._hash_image(url)
+        
+        hashes = await asyncio.gather(*(hash_image(url) for url in image_urls))
+        await self._sync_hashes([
+            image_hash for image_hash in hashes if not isinstance(image_hash, CheckResult)
+        ])
+        results = [
+            image_hash if isinstance(image_hash, CheckResult) else self._check_hash(image_hash, issue_id)
+            for image_hash in hashes
+        ]
+        await self.save_hashes()
         return results
     
     def clear_cache(self):
-        """Clear hash cache (for testing)"""
+        """Clear local hash cache (for testing)"""
         self.hash_cache.clear()
+        self._unsaved_hashes.clear()
+        self.url_hash_cache.clear()
     
     def get_cache_size(self) -> int:
         """Get number of hashes in cache"""
@@ -8,26 +8,57 @@ This service detects:
 - Common AI artifacts
 """
 
+import asyncio
 import logging
+import os
 from typing import Tuple, Dict, Any
-from PIL import Image
+from app.services._pil import Image
+import cv2
 import numpy as np
 import io
-import httpx
 
 from app.config import get_settings
 from app.models import CheckResult, CheckStatus
+from app.services.http_client import download_image
+
+try:
+    import onnxruntime as ort
+except ImportError:  # Optional: real detection falls back to heuristics
+    ort = None
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Prebuilt result for download failures
+_DOWNLOAD_FAILED = CheckResult(
+    status=CheckStatus.FAILED,
+    confidence=0.0,
+    details="Failed to download image"
+)
+
+# Common AI image dimensions
+_AI_DIMENSIONS = frozenset({
+    (512, 512), (1024, 1024), (768, 768),  # Stable Diffusion
+    (1024, 1792), (1792, 1024),  # DALL-E 3
+})
+
+# Square sizes typical of AI generation
+_AI_SQUARE_SIZES = frozenset({256, 512, 768, 1024, 2048})
+
+# Accelerated ONNX Runtime providers, in order of preference
+_PREFERRED_PROVIDERS = ("OpenVINOExecutionProvider", "CPUExecutionProvider")
+
 
 class FakeDetectionService:
     """Service for detecting fake/AI-generated images"""
     
+    # Maximum detections running at once in batch_detect
+    MAX_CONCURRENT_DETECTIONS = 8
+    
     def __init__(self):
         self.settings = settings
         self.model_loaded = False
+        self.session = None
         
         if not settings.enable_mock_ai:
             self._load_model()
@@ -35,9 +66,18 @@ class FakeDetectionService:
     def _load_model(self):
         """Load AI detection model"""
         try:
-            # TODO: Load actual deep learning model
-            # Example: self.model = torch.load(settings.fake_detection_model_path)
-            logger.info("Fake detection model loaded")
+            # The model is an INT8 ONNX export, quantized offline with
+            # onnxruntime.quantization.quantize_dynamic
+            model_path = settings.fake_detection_model_path
+            if ort is not None and os.path.exists(model_path):
+                available = set(ort.get_available_providers())
+                self.session = ort.InferenceSession(
+                    model_path,
+                    providers=[p for p in _PREFERRED_PROVIDERS if p in available]
+                )
+                logger.info(f"Fake detection model loaded ({self.session.get_providers()[0]})")
+            else:
+                logger.warning("Fake detection model not available, using heuristics")
             self.model_loaded = True
         except Exception as e:
             logger.error(f"Failed to load fake detection model: {e}")
@@ -55,13 +95,9 @@ class FakeDetectionService:
         """
         try:
             # Download image
-            image_data = await self._download_image(image_url)
+            image_data = await download_image(image_url)
             if not image_data:
-                return CheckResult(
-                    status=CheckStatus.FAILED,
-                    confidence=0.0,
-                    details="Failed to download image"
-                )
+                return _DOWNLOAD_FAILED
             
             # Open image
             image = Image.open(io.BytesIO(image_data))
@@ -70,8 +106,8 @@ class FakeDetectionService:
                 # Mock detection for development
                 result = self._mock_detection(image)
             else:
-                # Real AI detection
-                result = self._real_detection(image)
+                # Real AI detection; inference runs on a worker thread
+                result = await asyncio.to_thread(self._real_detection, image)
             
             return result
             
@@ -100,17 +136,13 @@ class FakeDetectionService:
         details = []
         
         # Check 1: Common AI image dimensions
-        ai_dimensions = [
-            (512, 512), (1024, 1024), (768, 768),  # Stable Diffusion
-            (1024, 1792), (1792, 1024),  # DALL-E 3
-        ]
-        if (width, height) in ai_dimensions:
+        if (width, height) in _AI_DIMENSIONS:
             is_suspicious = True
             confidence = 0.7
             details.append(f"Image dimensions ({width}x{height}) match common AI generation sizes")
         
         # Check 2: Perfect aspect ratios (AI often generates perfect squares)
-        if width == height and width in [256, 512, 768, 1024, 2048]:
+        if width == height and width in _AI_SQUARE_SIZES:
             is_suspicious = True
             confidence = min(confidence, 0.75)
             details.append("Perfect square dimensions suggest AI generation")
@@ -119,8 +151,8 @@ class FakeDetectionService:
         # This is a simplified check
         
         # Check 4: EXIF data presence (AI images often lack camera EXIF)
-        exif_data = image.getexif()
-        if not exif_data or len(exif_data) == 0:
+        has_exif = len(image.getexif()) > 0
+        if not has_exif:
             details.append("Missing EXIF data (common in AI-generated images)")
             confidence = min(confidence, 0.85)
         
@@ -139,7 +171,7 @@ class FakeDetectionService:
             details=final_details,
             metadata={
                 "dimensions": f"{width}x{height}",
-                "has_exif": bool(exif_data),
+                "has_exif": has_exif,
                 "checks_performed": ["dimension_analysis", "exif_check"]
             }
         )
@@ -148,11 +180,8 @@ class FakeDetectionService:
         """
         Real AI detection using deep learning model
         
-        TODO: Implement actual model inference
-        - Load pre-trained model (e.g., CNN-based detector)
-        - Preprocess image
-        - Run inference
-        - Return confidence score
+        Runs the ONNX model when one is loaded, otherwise falls back to
+        the heuristic checks.
         """
         if not self.model_loaded:
             return CheckResult(
@@ -162,14 +191,40 @@ class FakeDetectionService:
             )
         
         try:
-            # TODO: Implement real model inference
-            # Example:
-            # preprocessed = self._preprocess_image(image)
-            # prediction = self.model(preprocessed)
-            # confidence = prediction[0].item()
+            if self.session is None:
+                # No model available, fall back to heuristics
+                return self._mock_detection(image)
             
-            # For now, return mock result
-            return self._mock_detection(image)
+            # NHWC from preprocessing to the NCHW layout the model expects
+            model_input = np.ascontiguousarray(
+                self._preprocess_image(image).transpose(0, 3, 1, 2)
+            )
+            input_name = self.session.get_inputs()[0].name
+            output = self.session.run(None, {input_name: model_input})[0]
+            
+            # Output is (batch, [real, fake]) probabilities
+            fake_probability = float(output[0, 1])
+            confidence = 1.0 - fake_probability
+            
+            if confidence < 0.5:
+                status = CheckStatus.FAILED
+                details = f"Image is likely AI-generated (fake probability: {fake_probability:.2%})"
+            elif confidence < 0.8:
+                status = CheckStatus.WARNING
+                details = f"Image may be AI-generated (fake probability: {fake_probability:.2%})"
+            else:
+                status = CheckStatus.PASSED
+                details = "Image appears to be authentic"
+            
+            return CheckResult(
+                status=status,
+                confidence=confidence,
+                details=details,
+                metadata={
+                    "fake_probability": fake_probability,
+                    "checks_performed": ["model_inference"]
+                }
+            )
             
         except Exception as e:
             logger.error(f"Real detection failed: {e}")
@@ -179,33 +234,20 @@ class FakeDetectionService:
                 details=f"Model inference failed: {str(e)}"
             )
     
-    async def _download_image(self, image_url: str) -> bytes:
-        """Download image from URL"""
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(image_url)
-                response.raise_for_status()
-                return response.content
-        except Exception as e:
-            logger.error(f"Failed to download image from {image_url}: {e}")
-            return None
-    
     def _preprocess_image(self, image: Image.Image) -> np.ndarray:
         """Preprocess image for model input"""
-        # Resize to model input size
-        image = image.resize((224, 224))
-        
         # Convert to RGB if needed
         if image.mode != 'RGB':
             image = image.convert('RGB')
         
-        # Convert to numpy array and normalize
-        img_array = np.array(image) / 255.0
+        # Resize to model input size on uint8, then normalize in float32
+        img_array = cv2.resize(
+            np.asarray(image), (224, 224), interpolation=cv2.INTER_LINEAR
+        ).astype(np.float32)
+        img_array *= np.float32(1.0 / 255.0)
         
         # Add batch dimension
-        img_array = np.expand_dims(img_array, axis=0)
-        
-        return img_array
+        return img_array[np.newaxis, ...]
     
     async def batch_detect(self, image_urls: list) -> list:
         """
@@ -215,10 +257,12 @@ class FakeDetectionService:
             image_urls: List of image URLs
             
         Returns:
-            List of CheckResult objects
+            List of CheckResult objects, in input order
         """
-        results = []
-        for url in image_urls:
-            result = await self.detect_fake(url)
-            results.append(result)
-        return results
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_DETECTIONS)
+        
+        async def detect(url: str) -> CheckResult:
+            async with semaphore:
+                return await self.detect_fake(url)
+        
+        return await asyncio.gather(*(detect(url) for url in image_urls))
@@ -0,0 +1,223 @@
+"""
+Shared HTTP Client
+
+A single pooled httpx.AsyncClient reused by all services for image
+downloads, so keep-alive connections are shared instead of paying a new
+TCP/TLS handshake per image. Downloads are streamed and capped at
+max_image_size_mb so oversized images are never buffered in full, and
+recently downloaded images are kept in a small LRU cache so a URL checked
+by several services (or re-sent for cross-verification) is fetched once.
+Concurrent requests for a URL that is still downloading share that download.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import httpx
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_client: Optional[httpx.AsyncClient] = None
+
+# LRU cache of downloaded images keyed by URL, as (expiry time, bytes)
+_image_cache: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+# Total size of the cached image bytes, kept under image_cache_max_bytes
+_image_cache_bytes = 0
+
+# Downloads in progress keyed by URL, awaited by every concurrent caller
+_pending_downloads: Dict[str, "asyncio.Task[Optional[bytes]]"] = {}
+
+# Caps downloads in flight across all services, so fanned-out checks queue
+# instead of tripping upstream rate limits; created with the shared client
+_download_semaphore: Optional[asyncio.Semaphore] = None
+
+# Transient failures are retried with exponential backoff plus jitter
+DOWNLOAD_ATTEMPTS = 3
+_RETRY_INITIAL_DELAY = 0.2
+_RETRY_MAX_DELAY = 2.0
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Read size for streamed image bodies
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use"""
+    global _client, _download_semaphore
+    
+    if _download_semaphore is None:
+        _download_semaphore = asyncio.Semaphore(settings.max_concurrent_downloads)
+    
+    if _client is None or _client.is_closed:
+        # HTTP/2 multiplexes concurrent image fetches from one CDN host
+        # Storage and CDN image URLs commonly redirect to a signed location
+        _client = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            timeout=httpx.Timeout(settings.request_timeout_seconds, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=64,
+                keepalive_expiry=30.0
+            )
+        )
+        logger.info("Shared HTTP client created")
+    
+    return _client
+
+
+async def close_http_client():
+    """Close the shared HTTP client and release pooled connections"""
+    global _client, _download_semaphore
+    
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("Shared HTTP client closed")
+    _client = None
+    _download_semaphore = None
+
+
+def _get_cached_image(image_url: str) -> Optional[bytes]:
+    """Get cached image bytes, marking them as recently used"""
+    global _image_cache_bytes
+    
+    entry = _image_cache.get(image_url)
+    if entry is None:
+        return None
+    
+    expires_at, image_data = entry
+    if expires_at < time.monotonic():
+        del _image_cache[image_url]
+        _image_cache_bytes -= len(image_data)
+        return None
+    
+    _image_cache.move_to_end(image_url)
+    return image_data
+
+
+def _store_cached_image(image_url: str, image_data: bytes):
+    """
+    Cache image bytes, evicting the least recently used beyond the entry
+    and byte limits
+    """
+    global _image_cache_bytes
+    
+    max_size = settings.image_cache_size
+    max_bytes = settings.image_cache_max_bytes
+    if max_size <= 0 or len(image_data) > max_bytes:
+        return
+    
+    previous = _image_cache.pop(image_url, None)
+    if previous is not None:
+        _image_cache_bytes -= len(previous[1])
+    
+    _image_cache[image_url] = (time.monotonic() + settings.image_cache_ttl_seconds, image_data)
+    _image_cache_bytes += len(image_data)
+    while len(_image_cache) > max_size or _image_cache_bytes > max_bytes:
+        _, (_, evicted) = _image_cache.popitem(last=False)
+        _image_cache_bytes -= len(evicted)
+
+
+def clear_image_cache():
+    """Clear the downloaded image cache (for testing)"""
+    global _image_cache_bytes
+    
+    _image_cache.clear()
+    _image_cache_bytes = 0
+
+
+async def download_image(image_url: str) -> Optional[bytes]:
+    """
+    Download an image with the shared client, enforcing the size limit
+    
+    Recently downloaded URLs are served from the image cache, and
+    concurrent calls for the same URL share a single download.
+    
+    Returns:
+        Image bytes, or None if the download failed or exceeded the limit
+    """
+    image_data = _get_cached_image(image_url)
+    if image_data is not None:
+        return image_data
+    
+    task = _pending_downloads.get(image_url)
+    if task is None:
+        task = asyncio.create_task(_fetch_and_cache_image(image_url))
+        _pending_downloads[image_url] = task
+        task.add_done_callback(lambda _: _pending_downloads.pop(image_url, None))
+    
+    # Shielded so one cancelled caller does not cancel the download for the rest
+    return await asyncio.shield(task)
+
+
+async def _fetch_and_cache_image(image_url: str) -> Optional[bytes]:
+    """Download an image and cache it on success"""
+    image_data = await _fetch_image(image_url)
+    if image_data is not None:
+        _store_cached_image(image_url, image_data)
+    return image_data
+
+
+async def _fetch_image(image_url: str) -> Optional[bytes]:
+    """Download an image, retrying transient network and server errors"""
+    for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+        try:
+            return await _stream_image(image_url)
+        except Exception as e:
+            if attempt == DOWNLOAD_ATTEMPTS or not _is_retryable(e):
+                logger.error(f"Failed to download image from {image_url}: {e}")
+                return None
+            
+            delay = min(_RETRY_INITIAL_DELAY * 2 ** (attempt - 1), _RETRY_MAX_DELAY)
+            delay += random.uniform(0, delay)
+            logger.warning(
+                f"Download of {image_url} failed ({e}), retrying in {delay:.2f}s "
+                f"(attempt {attempt}/{DOWNLOAD_ATTEMPTS})"
+            )
+            await asyncio.sleep(delay)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether a download error is worth retrying"""
+    if isinstance(error, httpx.TransportError):
+        return True
+    return (
+        isinstance(error, httpx.HTTPStatusError)
+        and error.response.status_code in _RETRYABLE_STATUS_CODES
+    )
+
+
+async def _stream_image(image_url: str) -> Optional[bytes]:
+    """Stream an image from the network, aborting past the size limit"""
+    max_bytes = settings.max_image_size_mb * 1024 * 1024
+    client = get_http_client()
+    async with _download_semaphore, client.stream("GET", image_url) as response:
+        response.raise_for_status()
+        
+        # Reject up front when the server declares an oversized body
+        content_length = int(response.headers.get("content-length", 0))
+        if content_length > max_bytes:
+            logger.warning(
+                f"Image at {image_url} exceeds {settings.max_image_size_mb}MB, skipping download"
+            )
+            return None
+        
+        # Chunks are joined once at the end, rather than growing one buffer
+        # (reallocating as it goes) and then copying it into bytes
+        chunks = []
+        received = 0
+        async for chunk in response.aiter_bytes(_DOWNLOAD_CHUNK_SIZE):
+            received += len(chunk)
+            if received > max_bytes:
+                logger.warning(
+                    f"Image at {image_url} exceeds {settings.max_image_size_mb}MB, aborting download"
+                )
+                return None
+            chunks.append(chunk)
+        return b"".join(chunks)
@@ -8,19 +8,50 @@ This service performs reverse image search to detect:
 - Fake evidence
 """
 
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any
-from PIL import Image
+import re
+import time
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
+from app.services._pil import Image
 import io
-import httpx
-import hashlib
+import numpy as np
 
 from app.config import get_settings
+from app.cache import get_cached, set_cached
 from app.models import CheckResult, CheckStatus
+from app.services.duplicate_detection import (
+    calculate_dhash,
+    hamming_distances,
+    max_hamming_distance
+)
+from app.services.http_client import download_image
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Static results
+_DOWNLOAD_FAILED = CheckResult(
+    status=CheckStatus.FAILED,
+    confidence=0.0,
+    details="Failed to download image"
+)
+_SEARCH_DISABLED = CheckResult(
+    status=CheckStatus.SKIPPED,
+    confidence=0.0,
+    details="Internet search disabled"
+)
+
+# Stock photo sites, matched case-insensitively in one pass over each URL
+STOCK_PHOTO_SITES = ('shutterstock', 'getty', 'istockphoto', 'unsplash', 'pexels')
+_STOCK_PHOTO_SITE_RE = re.compile("|".join(map(re.escape, STOCK_PHOTO_SITES)), re.IGNORECASE)
+
+# Most match URLs listed in a result's sources
+_MAX_REPORTED_SOURCES = 5
+
+_INITIAL_FLAGGED_CAPACITY = 64
+
 
 class InternetSearchService:
     """Service for reverse image search"""
@@ -28,6 +59,16 @@ class InternetSearchService:
     def __init__(self):
         self.settings = settings
         self.search_enabled = settings.reverse_image_search_enabled
+        # dHashes of images already found on the internet, their expiry times
+        # and the results that flagged them, so re-uploads of those images
+        # skip the search API. Rows are in flagging order, oldest first, and
+        # bounded like the search cache
+        self._flagged_hashes = np.empty(_INITIAL_FLAGGED_CAPACITY, dtype=np.uint64)
+        self._flagged_expiry = np.empty(_INITIAL_FLAGGED_CAPACITY, dtype=np.float64)
+        self._flagged_results: List[CheckResult] = []
+        # LRU cache of search results keyed by dHash, as (expiry time, result);
+        # shared across replicas through Redis when caching is enabled
+        self.search_cache: "OrderedDict[int, Tuple[float, CheckResult]]" = OrderedDict()
     
     async def search_image(self, image_url: str) -> CheckResult:
         """
@@ -40,36 +81,30 @@ class InternetSearchService:
             CheckResult with search results
         """
         if not self.search_enabled:
-            return CheckResult(
-                status=CheckStatus.SKIPPED,
-                confidence=0.0,
-                details="Internet search disabled"
-            )
+            return _SEARCH_DISABLED
         
         try:
             # Download image
-            image_data = await self._download_image(image_url)
+            image_data = await download_image(image_url)
             if not image_data:
-                return CheckResult(
-                    status=CheckStatus.FAILED,
-                    confidence=0.0,
-                    details="Failed to download image"
-                )
+                return _DOWNLOAD_FAILED
             
-            # Perform search
-            search_results = await self._perform_search(image_data)
+            # Resized or recompressed copies of a flagged image match by dHash
+            image_hash = await asyncio.to_thread(self._calculate_image_hash, image_data)
+            flagged_result = self._find_flagged(image_hash)
+            if flagged_result is not None:
+                return flagged_result
             
-            if not search_results:
-                # No matches found - good sign
-                return CheckResult(
-                    status=CheckStatus.PASSED,
-                    confidence=0.9,
-                    details="No matches found on the internet. Image appears original.",
-                    metadata={"matches_found": 0}
-                )
+            # Exact re-uploads reuse the previous search result
+            cached_result = await self._get_cached_result(image_hash)
+            if cached_result is not None:
+                return cached_result
             
-            # Analyze results
-            return self._analyze_results(search_results)
+            result = await self._search(image_data)
+            if result.status != CheckStatus.PASSED:
+                self._flag_hash(image_hash, result)
+            await self._store_cached_result(image_hash, result)
+            return result
             
         except Exception as e:
             logger.error(f"Internet search failed: {e}")
@@ -79,6 +114,58 @@ class InternetSearchService:
                 details=f"Search error: {str(e)}"
             )
     
+    async def _search(self, image_data: bytes) -> CheckResult:
+        """Search for an image and analyze the matches"""
+        search_results = await self._perform_search(image_data)
+        
+        if not search_results:
+            # No matches found - good sign
+            return CheckResult(
+                status=CheckStatus.PASSED,
+                confidence=0.9,
+                details="No matches found on the internet. Image appears original.",
+                metadata={"matches_found": 0}
+            )
+        
+        # Analyze results
+        return self._analyze_results(search_results)
+    
+    async def _get_cached_result(self, image_hash: int) -> Optional[CheckResult]:
+        """Get a cached search result from memory, then Redis"""
+        entry = self.search_cache.get(image_hash)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at >= time.monotonic():
+                self.search_cache.move_to_end(image_hash)
+                return result
+            del self.search_cache[image_hash]
+        
+        cached = await get_cached(_search_cache_key(image_hash))
+        if cached is None:
+            return None
+        
+        result = CheckResult.model_validate_json(cached)
+        self._store_local_result(image_hash, result)
+        return result
+    
+    async def _store_cached_result(self, image_hash: int, result: CheckResult):
+        """Cache a search result in memory and Redis"""
+        self._store_local_result(image_hash, result)
+        await set_cached(
+            _search_cache_key(image_hash),
+            result.model_dump_json(),
+            ttl_seconds=settings.search_cache_ttl_seconds
+        )
+    
+    def _store_local_result(self, image_hash: int, result: CheckResult):
+        """Cache a search result in memory, evicting the least recently used"""
+        cache = self.search_cache
+        max_size = settings.search_cache_size
+        cache[image_hash] = (time.monotonic() + settings.search_cache_ttl_seconds, result)
+        cache.move_to_end(image_hash)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+    
     async def _perform_search(self, image_data: bytes) -> Optional[List[Dict[str, Any]]]:
         """
         Perform actual reverse image search
@@ -119,23 +206,27 @@ class InternetSearchService:
                 metadata={"matches_found": 0}
             )
         
-        # Check if matches are from stock photo sites
-        stock_sites = ['shutterstock', 'getty', 'istockphoto', 'unsplash', 'pexels']
-        stock_matches = [
-            r for r in results
-            if any(site in r.get('url', '').lower() for site in stock_sites)
-        ]
+        # Check if matches are from stock photo sites, counting them in one
+        # pass and keeping only the sources that are reported
+        stock_count = 0
+        stock_sources = []
+        for r in results:
+            url = r.get('url')
+            if url and _STOCK_PHOTO_SITE_RE.search(url):
+                stock_count += 1
+                if len(stock_sources) < _MAX_REPORTED_SOURCES:
+                    stock_sources.append(url)
         
-        if stock_matches:
+        if stock_count:
             return CheckResult(
                 status=CheckStatus.FAILED,
                 confidence=0.2,
-                details=f"Image found on stock photo sites ({len(stock_matches)} matches). "
+                details=f"Image found on stock photo sites ({stock_count} matches). "
                        f"This appears to be a reused stock image.",
                 metadata={
                     "matches_found": num_matches,
-                    "stock_matches": len(stock_matches),
-                    "sources": [r.get('url') for r in stock_matches[:5]]
+                    "stock_matches": stock_count,
+                    "sources": stock_sources
                 }
             )
         
@@ -148,7 +239,7 @@ class InternetSearchService:
                        f"May be reused from another source.",
                 metadata={
                     "matches_found": num_matches,
-                    "sources": [r.get('url') for r in results[:5]]
+                    "sources": [r.get('url') for r in results[:_MAX_REPORTED_SOURCES]]
                 }
             )
         
@@ -163,17 +254,78 @@ class InternetSearchService:
             }
         )
     
-    async def _download_image(self, image_url: str) -> bytes:
-        """Download image from URL"""
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(image_url)
-                response.raise_for_status()
-                return response.content
-        except Exception as e:
-            logger.error(f"Failed to download image from {image_url}: {e}")
+    def _calculate_image_hash(self, image_data: bytes) -> int:
+        """
+        Calculate perceptual hash of image for matching flagged images
+        
+        Uses dHash rather than a byte digest, so resized or recompressed
+        copies of an image still match.
+        """
+        image = Image.open(io.BytesIO(image_data))
+        image.draft('L', (256, 256))
+        return calculate_dhash(image)
+    
+    def _find_flagged(self, image_hash: int) -> Optional[CheckResult]:
+        """Get the result for a previously flagged image matching this hash"""
+        count = len(self._flagged_results)
+        if not count:
+            return None
+        
+        distances = hamming_distances(self._flagged_hashes[:count], image_hash)
+        matches = distances <= max_hamming_distance(settings.duplicate_threshold)
+        matches &= self._flagged_expiry[:count] >= time.monotonic()
+        match_rows = np.flatnonzero(matches)
+        if not match_rows.size:
             return None
+        return self._flagged_results[match_rows[0]]
     
-    def _calculate_image_hash(self, image_data: bytes) -> str:
-        """Calculate hash of image for caching"""
-        return hashlib.sha256(image_data).hexdigest()
+    def _flag_hash(self, image_hash: int, result: CheckResult):
+        """Remember an image found on the internet"""
+        max_size = settings.search_cache_size
+        if max_size <= 0:
+            return
+        
+        if len(self._flagged_results) >= max_size:
+            self._prune_flagged(max_size)
+        
+        row = len(self._flagged_results)
+        if row == len(self._flagged_hashes):
+            self._grow_flagged()
+        self._flagged_hashes[row] = image_hash
+        self._flagged_expiry[row] = time.monotonic() + settings.search_cache_ttl_seconds
+        self._flagged_results.append(result)
+    
+    def _prune_flagged(self, max_size: int):
+        """
+        Drop expired flagged hashes, then the oldest if still at the limit
+        
+        Pruning down to three quarters of the limit means a full index is
+        compacted once per max_size / 4 flags rather than on every flag.
+        """
+        count = len(self._flagged_results)
+        rows = np.flatnonzero(self._flagged_expiry[:count] >= time.monotonic())
+        if len(rows) >= max_size:
+            rows = rows[len(rows) - max_size * 3 // 4:]
+        
+        kept = len(rows)
+        self._flagged_hashes[:kept] = self._flagged_hashes[rows]
+        self._flagged_expiry[:kept] = self._flagged_expiry[rows]
+        self._flagged_results = [self._flagged_results[row] for row in rows.tolist()]
+    
+    def _grow_flagged(self):
+        """Double the capacity of the flagged hash and expiry arrays"""
+        capacity = len(self._flagged_hashes) * 2
+        count = len(self._flagged_results)
+        
+        hashes = np.empty(capacity, dtype=np.uint64)
+        hashes[:count] = self._flagged_hashes[:count]
+        expiry = np.empty(capacity, dtype=np.float64)
+        expiry[:count] = self._flagged_expiry[:count]
+        
+        self._flagged_hashes = hashes
+        self._flagged_expiry = expiry
+
+
+def _search_cache_key(image_hash: int) -> str:
+    """Redis key for a cached search result"""
+    return f"internet_search:{image_hash:016x}"
@@ -8,20 +8,100 @@ This service validates:
 - Location history analysis
 """
 
+import asyncio
 import logging
 from typing import Tuple, Optional
 from math import radians, cos, sin, asin, sqrt
-from PIL import Image
-import io
-import httpx
+import numpy as np
 
 from app.config import get_settings
 from app.models import CheckResult, CheckStatus, LocationData
+from app.services.http_client import download_image
 from app.services.metadata_validator import MetadataValidatorService
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# A failed download only warns, since location cannot be judged
+_DOWNLOAD_FAILED = CheckResult(
+    status=CheckStatus.WARNING,
+    confidence=0.5,
+    details="Failed to download image for location validation"
+)
+
+# Mean radius of the earth in meters
+EARTH_RADIUS_METERS = 6371000
+
+
+def haversine_distances(
+    lat1: np.ndarray,
+    lon1: np.ndarray,
+    lat2: np.ndarray,
+    lon2: np.ndarray
+) -> np.ndarray:
+    """
+    Haversine distance in meters between arrays of GPS coordinates
+    
+    Coordinates are in decimal degrees and broadcast against each other,
+    so one point can be compared with many in a single call.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(a))
+
+
+# Meters per degree of latitude (and of longitude at the equator)
+METERS_PER_DEGREE = EARTH_RADIUS_METERS * np.pi / 180
+
+# Radius above which nearby searches use exact Haversine distances rather
+# than the equirectangular approximation
+EQUIRECTANGULAR_MAX_RADIUS_METERS = 50_000
+
+
+def within_radius(
+    latitude: float,
+    longitude: float,
+    radius_meters: float,
+    lats: np.ndarray,
+    lons: np.ndarray
+) -> np.ndarray:
+    """
+    Boolean mask of the candidate points within radius_meters of a point
+    
+    A latitude/longitude bounding box rejects most candidates using only
+    subtractions. Survivors are measured with the equirectangular
+    approximation, which is within a fraction of a percent at city scale,
+    or with exact Haversine for radii beyond 50 km.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    
+    dlat = lats - latitude
+    # Wrap longitude differences across the antimeridian into [-180, 180)
+    dlon = (lons - longitude + 180.0) % 360.0 - 180.0
+    
+    # Longitude degrees are shortest at the box edge nearest a pole, so the
+    # box is widened with that edge's cosine to never reject a true match
+    max_dlat = radius_meters / METERS_PER_DEGREE
+    mask = np.abs(dlat) <= max_dlat
+    edge_cos = cos(radians(min(90.0, abs(latitude) + max_dlat)))
+    if edge_cos > 0:
+        mask &= np.abs(dlon) <= max_dlat / edge_cos
+    
+    rows = np.flatnonzero(mask)
+    if rows.size:
+        if radius_meters > EQUIRECTANGULAR_MAX_RADIUS_METERS:
+            distances = haversine_distances(latitude, longitude, lats[rows], lons[rows])
+            mask[rows] = distances <= radius_meters
+        else:
+            # Equirectangular distance, compared squared and in degrees to
+            # skip the square root and the scaling to meters
+            y = dlat[rows]
+            x = dlon[rows] * cos(radians(latitude))
+            mask[rows] = x * x + y * y <= max_dlat * max_dlat
+    return mask
+
 
 class LocationValidatorService:
     """Service for validating location consistency"""
@@ -47,17 +127,12 @@ class LocationValidatorService:
         """
         try:
             # Download image
-            image_data = await self._download_image(image_url)
+            image_data = await download_image(image_url)
             if not image_data:
-                return CheckResult(
-                    status=CheckStatus.WARNING,
-                    confidence=0.5,
-                    details="Failed to download image for location validation"
-                )
+                return _DOWNLOAD_FAILED
             
-            # Open image and extract EXIF
-            image = Image.open(io.BytesIO(image_data))
-            exif_data = self.metadata_service._extract_exif(image)
+            # Extract EXIF off the event loop
+            exif_data = await asyncio.to_thread(self.metadata_service.read_exif, image_data)
             
             # Extract GPS coordinates from EXIF
             exif_coords = self.metadata_service.extract_gps_coordinates(exif_data)
@@ -84,7 +159,8 @@ class LocationValidatorService:
             )
             
             # Check if within acceptable radius
-            is_within_radius = distance_meters <= settings.location_radius_meters
+            radius = settings.location_radius_meters
+            is_within_radius = distance_meters <= radius
             
             if is_within_radius:
                 return CheckResult(
@@ -106,7 +182,7 @@ class LocationValidatorService:
                     status=CheckStatus.FAILED,
                     confidence=0.3,
                     details=f"Location mismatch! EXIF GPS is {distance_meters:.1f}m away from reported location. "
-                           f"Acceptable radius: {settings.location_radius_meters}m",
+                           f"Acceptable radius: {radius}m",
                     metadata={
                         "has_exif_gps": True,
                         "exif_location": {"lat": exif_coords[0], "lon": exif_coords[1]},
@@ -115,7 +191,7 @@ class LocationValidatorService:
                             "lon": reported_location.longitude
                         },
                         "distance_meters": distance_meters,
-                        "acceptable_radius": settings.location_radius_meters
+                        "acceptable_radius": radius
                     }
                 )
                 
@@ -140,30 +216,55 @@ class LocationValidatorService:
         Returns:
             Distance in meters
         """
-        # Convert decimal degrees to radians
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+        # Convert decimal degrees to radians; longitudes are only needed as a difference
+        lat1 = radians(lat1)
+        lat2 = radians(lat2)
         
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+        # Haversine formula, squaring the half-angle sines by multiplication
+        sin_half_dlat = sin((lat2 - lat1) * 0.5)
+        sin_half_dlon = sin(radians(lon2 - lon1) * 0.5)
+        a = sin_half_dlat * sin_half_dlat + cos(lat1) * cos(lat2) * sin_half_dlon * sin_half_dlon
         c = 2 * asin(sqrt(a))
         
-        # Radius of earth in meters
-        r = 6371000
+        return c * EARTH_RADIUS_METERS
+    
+    def calculate_distances(self, pairs: np.ndarray) -> np.ndarray:
+        """
+        Calculate distances for many coordinate pairs at once
         
-        return c * r
+        Args:
+            pairs: Array of shape (N, 4) with rows of (lat1, lon1, lat2, lon2)
+            
+        Returns:
+            Array of N distances in meters
+        """
+        pairs = np.asarray(pairs, dtype=np.float64)
+        return haversine_distances(pairs[:, 0], pairs[:, 1], pairs[:, 2], pairs[:, 3])
     
-    async def _download_image(self, image_url: str) -> bytes:
-        """Download image from URL"""
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(image_url)
-                response.raise_for_status()
-                return response.content
-        except Exception as e:
-            logger.error(f"Failed to download image from {image_url}: {e}")
-            return None
+    def find_nearby(
+        self,
+        location: LocationData,
+        lats: np.ndarray,
+        lons: np.ndarray,
+        radius_meters: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Find candidate points near a location
+        
+        Args:
+            location: Location to search around
+            lats: Candidate latitudes
+            lons: Candidate longitudes
+            radius_meters: Search radius (defaults to location_radius_meters)
+            
+        Returns:
+            Indices of the candidates within the radius
+        """
+        if radius_meters is None:
+            radius_meters = settings.location_radius_meters
+        return np.flatnonzero(
+            within_radius(location.latitude, location.longitude, radius_meters, lats, lons)
+        )
     
     def validate_coordinates(self, latitude: float, longitude: float) -> bool:
         """
@@ -176,4 +277,18 @@ class LocationValidatorService:
         Returns:
             True if valid, False otherwise
         """
-        return -90 <= latitude <= 90 and -180 <= longitude <= 180
+        # Bounds are symmetric, so one comparison per axis suffices (NaN fails both)
+        return abs(latitude) <= 90.0 and abs(longitude) <= 180.0
+    
+    def validate_coordinates_batch(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """
+        Validate many coordinates at once
+        
+        Args:
+            lats: Latitudes (-90 to 90)
+            lons: Longitudes (-180 to 180)
+            
+        Returns:
+            Boolean array, True where the coordinates are valid
+        """
+        return (np.abs(lats) <= 90.0) & (np.abs(lons) <= 180.0)
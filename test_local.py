@@ -3,15 +3,18 @@ Local Testing Script for CivicFix AI Service
 Tests the API endpoints without deploying to cloud
 """
 
-import requests
-import json
+import asyncio
 import sys
-import time
+
+import httpx
 
 # Configuration
 BASE_URL = "http://localhost:8080"
 API_KEY = "8209d737eb28d61c61026a61ee96326a96ebbc67ccc89ac04a8b6495f63d011b0f1053467bd9970399e7ad5e598115f1489265d916868dc55d1d687a06b33562"
 
+# Tests are independent, so they run concurrently, at most this many at a time
+MAX_CONCURRENT_TESTS = 4
+
 def print_test(name, passed, message=""):
     """Print test result"""
     status = "✓ PASS" if passed else "✗ FAIL"
@@ -21,78 +24,65 @@ def print_test(name, passed, message=""):
     if message:
         print(f"  {message}")
 
-def test_health_endpoint():
+async def test_health_endpoint(client):
     """Test /health endpoint"""
     try:
-        response = requests.get(f"{BASE_URL}/health", timeout=5)
+        response = await client.get("/health", timeout=5)
         passed = response.status_code == 200
         
         if passed:
             data = response.json()
-            print_test("Health Endpoint", True, f"Status: {data.get('status')}")
-            return True
+            return True, f"Status: {data.get('status')}"
         else:
-            print_test("Health Endpoint", False, f"Status code: {response.status_code}")
-            return False
-    except requests.exceptions.ConnectionError:
-        print_test("Health Endpoint", False, "Cannot connect - is the service running?")
-        return False
+            return False, f"Status code: {response.status_code}"
+    except httpx.ConnectError:
+        return False, "Cannot connect - is the service running?"
     except Exception as e:
-        print_test("Health Endpoint", False, f"Error: {str(e)}")
-        return False
+        return False, f"Error: {str(e)}"
 
-def test_root_endpoint():
+async def test_root_endpoint(client):
     """Test / endpoint"""
     try:
-        response = requests.get(f"{BASE_URL}/", timeout=5)
+        response = await client.get("/", timeout=5)
         passed = response.status_code == 200
         
         if passed:
             data = response.json()
-            print_test("Root Endpoint", True, f"Service: {data.get('service')}")
-            return True
+            return True, f"Service: {data.get('service')}"
         else:
-            print_test("Root Endpoint", False, f"Status code: {response.status_code}")
-            return False
+            return False, f"Status code: {response.status_code}"
     except Exception as e:
-        print_test("Root Endpoint", False, f"Error: {str(e)}")
-        return False
+        return False, f"Error: {str(e)}"
 
-def test_stats_endpoint():
+async def test_stats_endpoint(client):
     """Test /api/v1/stats endpoint (requires API key)"""
     try:
         headers = {"X-API-Key": API_KEY}
-        response = requests.get(f"{BASE_URL}/api/v1/stats", headers=headers, timeout=5)
+        response = await client.get("/api/v1/stats", headers=headers, timeout=5)
         passed = response.status_code == 200
         
         if passed:
             data = response.json()
-            print_test("Stats Endpoint", True, f"Total verifications: {data.get('total_verifications', 0)}")
-            return True
+            return True, f"Total verifications: {data.get('total_verifications', 0)}"
         else:
-            print_test("Stats Endpoint", False, f"Status code: {response.status_code}")
-            return False
+            return False, f"Status code: {response.status_code}"
     except Exception as e:
-        print_test("Stats Endpoint", False, f"Error: {str(e)}")
-        return False
+        return False, f"Error: {str(e)}"
 
-def test_stats_without_api_key():
+async def test_stats_without_api_key(client):
     """Test /api/v1/stats without API key (should fail)"""
     try:
-        response = requests.get(f"{BASE_URL}/api/v1/stats", timeout=5)
+        response = await client.get("/api/v1/stats", timeout=5)
         passed = response.status_code == 401  # Should be unauthorized
         
         if passed:
-            print_test("Stats Auth Check", True, "Correctly requires API key")
-            return True
+            return True, "Correctly requires API key"
         else:
-            print_test("Stats Auth Check", False, f"Expected 401, got {response.status_code}")
-            return False
+            return False, f"Expected 401, got {response.status_code}"
     except Exception as e:
-        print_test("Stats Auth Check", False, f"Error: {str(e)}")
-        return False
+        return False, f"Error: {str(e)}"
 
-def test_initial_verification():
+async def test_initial_verification(client):
     """Test /api/v1/verify/initial endpoint"""
     try:
         headers = {
@@ -108,8 +98,8 @@ def test_initial_verification():
             "description": "Large pothole on main road"
         }
         
-        response = requests.post(
-            f"{BASE_URL}/api/v1/verify/initial",
+        response = await client.post(
+            "/api/v1/verify/initial",
             headers=headers,
             json=payload,
             timeout=30
@@ -119,70 +109,89 @@ def test_initial_verification():
         
         if passed:
             data = response.json()
-            print_test("Initial Verification", True, f"Status: {data.get('status')}, Confidence: {data.get('confidence_score', 0):.2f}")
-            return True
+            return True, f"Status: {data.get('status')}, Confidence: {data.get('confidence_score', 0):.2f}"
         else:
-            print_test("Initial Verification", False, f"Status code: {response.status_code}")
+            message = f"Status code: {response.status_code}"
             if response.text:
-                print(f"  Response: {response.text[:200]}")
-            return False
+                message += f"\n  Response: {response.text[:200]}"
+            return False, message
     except Exception as e:
-        print_test("Initial Verification", False, f"Error: {str(e)}")
-        return False
+        return False, f"Error: {str(e)}"
 
-def test_cors():
+async def test_cors(client):
     """Test CORS headers"""
     try:
         headers = {"Origin": "http://localhost:3000"}
-        response = requests.options(f"{BASE_URL}/health", headers=headers, timeout=5)
+        response = await client.options("/health", headers=headers, timeout=5)
         
         has_cors = "access-control-allow-origin" in response.headers
-        print_test("CORS Headers", has_cors, "CORS enabled" if has_cors else "CORS not configured")
-        return has_cors
+        return has_cors, "CORS enabled" if has_cors else "CORS not configured"
     except Exception as e:
-        print_test("CORS Headers", False, f"Error: {str(e)}")
-        return False
+        return False, f"Error: {str(e)}"
 
-def main():
-    """Run all tests"""
-    print("=" * 60)
-    print("CivicFix AI Service - Local Testing")
-    print("=" * 60)
-    print(f"Testing service at: {BASE_URL}")
-    print()
-    
-    # Wait for service to be ready
+# (display name, summary name, test)
+TESTS = [
+    ("Health Endpoint", "Health Check", test_health_endpoint),
+    ("Root Endpoint", "Root Endpoint", test_root_endpoint),
+    ("CORS Headers", "CORS", test_cors),
+    ("Stats Endpoint", "Stats (with auth)", test_stats_endpoint),
+    ("Stats Auth Check", "Stats (without auth)", test_stats_without_api_key),
+    ("Initial Verification", "Initial Verification", test_initial_verification),
+]
+
+async def wait_for_service(client):
+    """Wait for the service to answer /health"""
     print("Waiting for service to start...")
     max_retries = 10
     for i in range(max_retries):
         try:
-            requests.get(f"{BASE_URL}/health", timeout=2)
+            await client.get("/health", timeout=2)
             print("Service is ready!")
-            break
-        except:
+            return True
+        except Exception:
             if i < max_retries - 1:
-                time.sleep(2)
-            else:
-                print("\n✗ Service did not start in time")
-                print("\nMake sure the service is running:")
-                print("  docker-compose up")
-                print("  or")
-                print("  uvicorn app.main:app --host 0.0.0.0 --port 8080")
-                sys.exit(1)
+                await asyncio.sleep(2)
+    return False
+
+async def run_tests(client):
+    """Run all tests concurrently, returning (passed, message) in TESTS order"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_TESTS)
     
+    async def run(test):
+        async with semaphore:
+            return await test(client)
+    
+    return await asyncio.gather(*(run(test) for _, _, test in TESTS))
+
+async def async_main():
+    """Run all tests"""
+    print("=" * 60)
+    print("CivicFix AI Service - Local Testing")
+    print("=" * 60)
+    print(f"Testing service at: {BASE_URL}")
     print()
-    print("Running tests...")
-    print("-" * 60)
     
-    results = []
+    async with httpx.AsyncClient(base_url=BASE_URL) as client:
+        # Wait for service to be ready
+        if not await wait_for_service(client):
+            print("\n✗ Service did not start in time")
+            print("\nMake sure the service is running:")
+            print("  docker-compose up")
+            print("  or")
+            print("  uvicorn app.main:app --host 0.0.0.0 --port 8080")
+            sys.exit(1)
+        
+        print()
+        print("Running tests...")
+        print("-" * 60)
+        
+        outcomes = await run_tests(client)
     
-    # Run tests
-    results.append(("Health Check", test_health_endpoint()))
-    results.append(("Root Endpoint", test_root_endpoint()))
-    results.append(("CORS", test_cors()))
-    results.append(("Stats (with auth)", test_stats_endpoint()))
-    results.append(("Stats (without auth)", test_stats_without_api_key()))
-    results.append(("Initial Verification", test_initial_verification()))
+    # Report once all tests finish, so output is not interleaved
+    results = []
+    for (display_name, summary_name, _), (passed, message) in zip(TESTS, outcomes):
+        print_test(display_name, passed, message)
+        results.append((summary_name, passed))
     
     # Summary
     print()
@@ -203,5 +212,9 @@ def main():
         print(f"\n✗ {total - passed} test(s) failed. Check the output above.")
         sys.exit(1)
 
+def main():
+    """Run all tests"""
+    asyncio.run(async_main())
+
 if __name__ == "__main__":
     main()
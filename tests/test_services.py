@@ -2,48 +2,92 @@
 Unit tests for AI verification services
 """
 
+import asyncio
+import functools
 import pytest
 from PIL import Image
 import io
+import numpy as np
 
 from app.services.fake_detection import FakeDetectionService
-from app.services.duplicate_detection import DuplicateDetectionService
+from app.services.duplicate_detection import (
+    DuplicateDetectionService,
+    _popcount_swar,
+    max_hamming_distance
+)
 from app.services.metadata_validator import MetadataValidatorService
-from app.services.location_validator import LocationValidatorService
+from app.services.location_validator import (
+    LocationValidatorService,
+    haversine_distances
+)
 from app.services.category_validator import CategoryValidatorService
-from app.models import LocationData, CheckStatus
+from app.services.internet_search import InternetSearchService
+from app.services.cross_verification import CrossVerificationService
+from app.services import http_client
+from app.models import LocationData, CheckResult, CheckStatus
 
 
-@pytest.fixture
+@functools.lru_cache(maxsize=None)
+def _make_image(size: tuple, color: str) -> Image.Image:
+    """Solid-color test image, shared between tests (copy before mutating)"""
+    return Image.new('RGB', size, color=color)
+
+
+# Services are stateless apart from their caches, so each is built once per
+# session and its caches are reset after every test
+@pytest.fixture(scope="session")
 def fake_detection_service():
     return FakeDetectionService()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def duplicate_detection_service():
     return DuplicateDetectionService()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def metadata_validator_service():
     return MetadataValidatorService()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def location_validator_service():
     return LocationValidatorService()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def category_validator_service():
     return CategoryValidatorService()
 
 
+@pytest.fixture(scope="session")
+def cross_verification_service():
+    return CrossVerificationService()
+
+
 @pytest.fixture
+def internet_search_service():
+    return InternetSearchService()
+
+
+@pytest.fixture(autouse=True)
+def _reset_service_caches(duplicate_detection_service, category_validator_service):
+    """Keep cached state from leaking between tests"""
+    yield
+    duplicate_detection_service.clear_cache()
+    category_validator_service.clear_cache()
+
+
+@pytest.fixture(scope="session")
 def sample_image():
-    """Create a sample image for testing"""
-    img = Image.new('RGB', (512, 512), color='red')
-    return img
+    """Create a sample image for testing (shared; copy before mutating)"""
+    return _make_image((512, 512), 'red')
+
+
+@pytest.fixture(scope="session")
+def sample_image_hash(duplicate_detection_service, sample_image):
+    """Image hash of sample_image, calculated once"""
+    return duplicate_detection_service._calculate_hash(sample_image)
 
 
 class TestFakeDetectionService:
@@ -57,7 +101,7 @@ class TestFakeDetectionService:
     
     def test_mock_detection_non_square_image(self, fake_detection_service):
         """Test mock detection with non-square image"""
-        img = Image.new('RGB', (800, 600), color='blue')
+        img = _make_image((800, 600), 'blue')
         result = fake_detection_service._mock_detection(img)
         assert result.status == CheckStatus.PASSED
         assert result.confidence > 0.8
@@ -66,24 +110,24 @@ class TestFakeDetectionService:
 class TestDuplicateDetectionService:
     """Tests for duplicate detection service"""
     
-    def test_no_duplicate_first_image(self, duplicate_detection_service, sample_image):
+    def test_no_duplicate_first_image(self, duplicate_detection_service, sample_image_hash):
         """Test first image has no duplicates"""
-        # Calculate hash
-        phash = duplicate_detection_service._calculate_phash(sample_image)
+        duplicate_detection_service.clear_cache()
         
         # Check duplicates (should be none)
-        is_dup, similarity, issue_id = duplicate_detection_service._check_duplicates(phash, None)
+        is_dup, similarity, issue_id = duplicate_detection_service._check_duplicates(sample_image_hash, None)
         assert not is_dup
         assert similarity == 0.0
     
-    def test_duplicate_detection_same_image(self, duplicate_detection_service, sample_image):
+    def test_duplicate_detection_same_image(self, duplicate_detection_service, sample_image_hash):
         """Test duplicate detection with same image"""
-        # Calculate hash and store
-        phash = duplicate_detection_service._calculate_phash(sample_image)
-        duplicate_detection_service._store_hash(phash, 1)
+        duplicate_detection_service.clear_cache()
+        
+        # Store hash
+        duplicate_detection_service._store_hash(sample_image_hash, 1)
         
         # Check again (should find duplicate)
-        is_dup, similarity, issue_id = duplicate_detection_service._check_duplicates(phash, 2)
+        is_dup, similarity, issue_id = duplicate_detection_service._check_duplicates(sample_image_hash, 2)
         assert is_dup
         assert similarity >= 0.85
         assert issue_id == 1
@@ -93,15 +137,96 @@ class TestDuplicateDetectionService:
         initial_size = duplicate_detection_service.get_cache_size()
         
         # Add some hashes
-        img1 = Image.new('RGB', (100, 100), color='red')
-        phash1 = duplicate_detection_service._calculate_phash(img1)
-        duplicate_detection_service._store_hash(phash1, 1)
+        img1 = _make_image((100, 100), 'red')
+        image_hash1 = duplicate_detection_service._calculate_hash(img1)
+        duplicate_detection_service._store_hash(image_hash1, 1)
         
         assert duplicate_detection_service.get_cache_size() == initial_size + 1
+        assert duplicate_detection_service._hashes[initial_size] == image_hash1
         
         # Clear cache
         duplicate_detection_service.clear_cache()
         assert duplicate_detection_service.get_cache_size() == 0
+    
+    def test_duplicate_scan_large_cache(self, duplicate_detection_service):
+        """Test a near match is found among many stored hashes"""
+        hashes = np.random.default_rng(1).integers(0, 2**63, size=10_000, dtype=np.uint64)
+        for issue_id, image_hash in enumerate(hashes.tolist(), start=1):
+            duplicate_detection_service._store_hash(image_hash, issue_id)
+        assert duplicate_detection_service.get_cache_size() == 10_000
+        
+        # Flip 3 bits of a stored hash (similarity 61/64)
+        near_hash = int(hashes[4321]) ^ 0b10101
+        is_dup, similarity, issue_id = duplicate_detection_service._check_duplicates(near_hash, None)
+        assert is_dup
+        assert issue_id == 4322
+        assert similarity == pytest.approx(1 - 3 / 64)
+    
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize("n", [1_000, 10_000, 100_000])
+    def test_scan_throughput(self, duplicate_detection_service, benchmark, n):
+        """Benchmark the duplicate scan over n stored hashes"""
+        hashes = np.random.default_rng(n).integers(0, 2**63, size=n, dtype=np.uint64)
+        for issue_id, image_hash in enumerate(hashes.tolist(), start=1):
+            duplicate_detection_service._store_hash(image_hash, issue_id)
+        
+        # Worst case: no stored hash matches, so every row is scanned
+        query = 2**64 - 1
+        is_dup, _, _ = benchmark(duplicate_detection_service._check_duplicates, query, None)
+        assert not is_dup
+    
+    def test_max_hamming_distance(self):
+        """Test similarity thresholds convert to inclusive bit distances"""
+        assert max_hamming_distance(0.85) == 9
+        assert max_hamming_distance(0.75) == 16
+        assert max_hamming_distance(1.0) == 0
+    
+    def test_popcount_fallback(self):
+        """Test the SWAR bit count used without np.bitwise_count"""
+        values = np.random.default_rng(0).integers(0, 2**63, size=100, dtype=np.uint64)
+        values = np.append(values, [np.uint64(0), np.uint64(2**64 - 1)])
+        
+        expected = [bin(int(value)).count("1") for value in values]
+        assert _popcount_swar(values).tolist() == expected
+    
+    @pytest.mark.asyncio
+    async def test_hashes_persist_to_redis(self, sample_image_hash):
+        """Test stored hashes round-trip through Redis"""
+        class FakeRedis:
+            def __init__(self):
+                self.data = {}
+            
+            async def hset(self, key, mapping):
+                self.data.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+            
+            async def hgetall(self, key):
+                return dict(self.data.get(key, {}))
+            
+            async def hmget(self, key, fields):
+                stored = self.data.get(key, {})
+                return [stored.get(field) for field in fields]
+        
+        redis = FakeRedis()
+        writer = DuplicateDetectionService()
+        writer.redis = redis
+        writer._store_hash(sample_image_hash, 1)
+        await writer.save_hashes()
+        
+        reader = DuplicateDetectionService()
+        reader.redis = redis
+        assert await reader.load_hashes() == 1
+        is_dup, _, issue_id = reader._check_duplicates(sample_image_hash, 2)
+        assert is_dup
+        assert issue_id == 1
+        
+        # A hash saved by another worker after loading is found by exact lookup
+        other_hash = sample_image_hash ^ (2**64 - 1)
+        writer._store_hash(other_hash, 3)
+        await writer.save_hashes()
+        await reader._sync_hashes([other_hash])
+        result = reader._check_hash(other_hash, 4)
+        assert result.status == CheckStatus.FAILED
+        assert result.metadata["duplicate_issue_id"] == 3
 
 
 class TestLocationValidatorService:
@@ -119,6 +244,66 @@ class TestLocationValidatorService:
         # Should be approximately 1000-1200 meters
         assert 900 < distance < 1300
     
+    def test_batch_distance_calculation(self, location_validator_service):
+        """Test vectorized distances match the scalar calculation"""
+        pairs = [
+            (13.0827, 80.2707, 13.0927, 80.2707),
+            (13.0827, 80.2707, 13.0827, 80.2717),
+            (51.5074, -0.1278, 48.8566, 2.3522),
+        ]
+        
+        distances = location_validator_service.calculate_distances(pairs)
+        
+        assert distances.shape == (3,)
+        for pair, distance in zip(pairs, distances):
+            assert distance == pytest.approx(location_validator_service._calculate_distance(*pair))
+    
+    def test_vectorized_distances_match_scalar(self, location_validator_service):
+        """Test one point broadcasts against arrays of candidates"""
+        lat, lon = 13.0827, 80.2707
+        
+        distances = haversine_distances(lat, lon, np.array([lat, 13.0927, 13.1827]), np.full(3, lon))
+        assert distances[0] == 0.0
+        assert 900 < distances[1] < 1300
+        assert distances[2] == pytest.approx(10 * distances[1], rel=1e-3)
+        
+        # Agrees with the scalar path across many candidates
+        rng = np.random.default_rng(2)
+        lats = rng.uniform(12.5, 13.5, 10_000)
+        lons = rng.uniform(79.8, 80.8, 10_000)
+        distances = haversine_distances(lat, lon, lats, lons)
+        scalar = [
+            location_validator_service._calculate_distance(lat, lon, candidate_lat, candidate_lon)
+            for candidate_lat, candidate_lon in zip(lats.tolist(), lons.tolist())
+        ]
+        assert distances.argmin() == np.argmin(scalar)
+        np.testing.assert_allclose(distances, scalar, rtol=1e-9)
+    
+    def test_equirectangular_approximation(self, location_validator_service):
+        """Test the nearby-search approximation against Haversine"""
+        # Chennai coordinates, approx 1.5km apart
+        lat1, lon1 = 13.0827, 80.2707
+        lat2, lon2 = 13.0927, 80.2807
+        
+        exact = location_validator_service._calculate_distance(lat1, lon1, lat2, lon2)
+        location = LocationData(latitude=lat1, longitude=lon1)
+        
+        # The approximated distance is within 0.5% of Haversine
+        for radius, expected in ((exact * 1.005, [0]), (exact * 0.995, [])):
+            nearby = location_validator_service.find_nearby(
+                location, np.array([lat2]), np.array([lon2]), radius_meters=radius
+            )
+            assert nearby.tolist() == expected
+        
+        # Offsets of 0.0005-0.01 degrees: 1st and 2nd within 1km, 3rd outside
+        nearby = location_validator_service.find_nearby(
+            location,
+            np.array([lat1 + 0.0005, lat1, lat1 + 0.01, -lat1]),
+            np.array([lon1, lon1 + 0.008, lon1 + 0.0005, lon1]),
+            radius_meters=1000
+        )
+        assert nearby.tolist() == [0, 1]
+    
     def test_validate_coordinates(self, location_validator_service):
         """Test coordinate validation"""
         # Valid coordinates
@@ -131,6 +316,20 @@ class TestLocationValidatorService:
         assert not location_validator_service.validate_coordinates(91, 0)
         assert not location_validator_service.validate_coordinates(0, 181)
         assert not location_validator_service.validate_coordinates(-91, 0)
+    
+    def test_validate_coordinates_batch(self, location_validator_service):
+        """Test batch coordinate validation matches the scalar check"""
+        rng = np.random.default_rng(3)
+        lats = rng.uniform(-120, 120, 10_000)
+        lons = rng.uniform(-240, 240, 10_000)
+        lats[:3] = [90, -90, np.nan]
+        
+        valid = location_validator_service.validate_coordinates_batch(lats, lons)
+        expected = [
+            location_validator_service.validate_coordinates(lat, lon)
+            for lat, lon in zip(lats.tolist(), lons.tolist())
+        ]
+        assert valid.tolist() == expected
 
 
 class TestCategoryValidatorService:
@@ -162,6 +361,56 @@ class TestCategoryValidatorService:
         )
         assert result.status == CheckStatus.WARNING
         assert result.confidence < 0.7
+    
+    def test_mock_validation_matches_whole_words(self, category_validator_service, sample_image):
+        """Test keywords don't match inside longer words"""
+        result = category_validator_service._mock_validation(
+            sample_image,
+            "Parks & Recreation",
+            "Parking lot near the stadium"
+        )
+        assert "park" not in result.metadata["matched_keywords"]
+        assert result.metadata["match_ratio"] == 0
+    
+    def test_result_cache(self, category_validator_service, sample_image):
+        """Test cached results are keyed by inputs"""
+        result = category_validator_service._mock_validation(
+            sample_image,
+            "Road Infrastructure",
+            "Pothole on the road"
+        )
+        key = category_validator_service._cache_key("http://img/1", "Road Infrastructure", "Pothole on the road")
+        category_validator_service._store_cached_result(key, result)
+        
+        assert category_validator_service._get_cached_result(key) is result
+        other_key = category_validator_service._cache_key("http://img/1", "Road Infrastructure", "Other text")
+        assert category_validator_service._get_cached_result(other_key) is None
+        
+        category_validator_service.clear_cache()
+        assert category_validator_service._get_cached_result(key) is None
+    
+    @pytest.mark.asyncio
+    async def test_batch_validate_order_and_concurrency(self, category_validator_service, monkeypatch):
+        """Test batch results keep input order with bounded concurrency"""
+        running = 0
+        peak = 0
+        
+        async def validate_category(image_url, category, description):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            # Later URLs finish first
+            await asyncio.sleep(0.001 * (20 - int(image_url.rsplit("/", 1)[1])))
+            running -= 1
+            return CheckResult(status=CheckStatus.PASSED, confidence=1.0, details=image_url)
+        
+        monkeypatch.setattr(category_validator_service, "validate_category", validate_category)
+        urls = [f"http://img/{i}" for i in range(20)]
+        
+        results = await category_validator_service.batch_validate(urls, "Road Infrastructure", "Pothole")
+        
+        assert [result.details for result in results] == urls
+        assert peak == category_validator_service.MAX_CONCURRENT_VALIDATIONS
 
 
 class TestMetadataValidatorService:
@@ -180,9 +429,136 @@ class TestMetadataValidatorService:
         assert result.status == CheckStatus.WARNING
         assert result.confidence < 1.0
         assert "No EXIF data" in result.details
+    
+    def test_extract_exif_gps(self, metadata_validator_service):
+        """Test GPS and capture time are read from their EXIF sub-IFDs"""
+        exif = Image.Exif()
+        exif[0x010F] = "Canon"
+        exif.get_ifd(0x8769)[0x9003] = "2024:01:01 10:00:00"
+        gps = exif.get_ifd(0x8825)
+        gps.update({1: "N", 2: (13.0, 4.0, 57.72), 3: "E", 4: (80.0, 16.0, 14.52)})
+        
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 64)).save(buffer, format='JPEG', exif=exif)
+        image = Image.open(io.BytesIO(buffer.getvalue()))
+        
+        exif_data = metadata_validator_service._extract_exif(image)
+        assert exif_data["DateTimeOriginal"] == "2024:01:01 10:00:00"
+        
+        lat, lon = metadata_validator_service.extract_gps_coordinates(exif_data)
+        assert lat == pytest.approx(13.0827, abs=1e-4)
+        assert lon == pytest.approx(80.2707, abs=1e-4)
+
+
+class TestInternetSearchService:
+    """Tests for internet search service"""
+    
+    def test_flagged_image_matches_resized_copy(self, internet_search_service):
+        """Test a flagged image is recognized after resizing and recompression"""
+        rng = np.random.default_rng(0)
+        
+        def random_image():
+            pixels = rng.integers(0, 256, (12, 16, 3), dtype=np.uint8)
+            return Image.fromarray(pixels).resize((640, 480), Image.BILINEAR)
+        
+        original = random_image()
+        copy = original.resize((320, 240))
+        
+        def jpeg_bytes(img):
+            buffer = io.BytesIO()
+            img.save(buffer, format='JPEG', quality=70)
+            return buffer.getvalue()
+        
+        flagged = CheckResult(status=CheckStatus.FAILED, confidence=0.2, details="Stock image")
+        internet_search_service._flag_hash(
+            internet_search_service._calculate_image_hash(jpeg_bytes(original)),
+            flagged
+        )
+        
+        copy_hash = internet_search_service._calculate_image_hash(jpeg_bytes(copy))
+        assert internet_search_service._find_flagged(copy_hash) is flagged
+        
+        other_hash = internet_search_service._calculate_image_hash(jpeg_bytes(random_image()))
+        assert internet_search_service._find_flagged(other_hash) is None
+    
+    def test_flagged_hashes_bounded(self, internet_search_service, monkeypatch):
+        """Test flagged hashes expire and are capped at the search cache size"""
+        monkeypatch.setattr(internet_search_service.settings, "search_cache_size", 100)
+        flagged = CheckResult(status=CheckStatus.FAILED, confidence=0.2, details="Stock image")
+        
+        hashes = np.random.default_rng(4).integers(0, 2**63, size=200, dtype=np.uint64).tolist()
+        for image_hash in hashes:
+            internet_search_service._flag_hash(image_hash, flagged)
+        
+        assert len(internet_search_service._flagged_results) <= 100
+        assert internet_search_service._find_flagged(hashes[0]) is None
+        assert internet_search_service._find_flagged(hashes[-1]) is flagged
+        
+        # Expired entries are ignored
+        internet_search_service._flagged_expiry[:] = 0
+        assert internet_search_service._find_flagged(hashes[-1]) is None
+
+
+class TestCrossVerificationService:
+    """Tests for cross verification service"""
+    
+    @staticmethod
+    def _scene(seed: int) -> np.ndarray:
+        pixels = np.random.default_rng(seed).integers(0, 256, (32, 32), dtype=np.uint8)
+        return np.asarray(Image.fromarray(pixels).resize((256, 256), Image.BILINEAR))
+    
+    def test_identical_images_not_completed(self, cross_verification_service):
+        """Test identical before/after images do not count as completed work"""
+        before = Image.fromarray(self._scene(0))
+        
+        assert not cross_verification_service._detect_work_completion(before, before.copy(), "pothole")
+    
+    def test_brightness_shift_not_completed(self, cross_verification_service):
+        """Test a global lighting change alone does not count as completed work"""
+        scene = self._scene(0)
+        brighter = np.clip(scene.astype(np.int16) + 40, 0, 255).astype(np.uint8)
+        
+        assert not cross_verification_service._detect_work_completion(
+            Image.fromarray(scene), Image.fromarray(brighter), "pothole"
+        )
+    
+    def test_structural_change_completed(self, cross_verification_service):
+        """Test a large structural change to part of the scene counts as completed work"""
+        scene = self._scene(0)
+        repaired = scene.copy()
+        repaired[:128] = self._scene(1)[:128]
+        
+        assert cross_verification_service._detect_work_completion(
+            Image.fromarray(scene), Image.fromarray(repaired), "pothole"
+        )
+
+
+class TestHttpClient:
+    """Tests for the shared image download cache"""
+    
+    def test_image_cache_byte_budget(self, monkeypatch):
+        """Test cached images are evicted to stay under the byte budget"""
+        monkeypatch.setattr(http_client.settings, "image_cache_max_bytes", 250)
+        http_client.clear_image_cache()
+        
+        http_client._store_cached_image("http://img/1", b"a" * 100)
+        http_client._store_cached_image("http://img/2", b"b" * 100)
+        http_client._store_cached_image("http://img/3", b"c" * 100)
+        # Larger than the whole budget, so never cached
+        http_client._store_cached_image("http://img/4", b"d" * 300)
+        
+        assert http_client._get_cached_image("http://img/1") is None
+        assert http_client._get_cached_image("http://img/2") == b"b" * 100
+        assert http_client._get_cached_image("http://img/3") == b"c" * 100
+        assert http_client._get_cached_image("http://img/4") is None
+        assert http_client._image_cache_bytes == 200
+        
+        http_client.clear_image_cache()
+        assert http_client._image_cache_bytes == 0
 
 
 # Integration test
+@pytest.mark.slow
 @pytest.mark.asyncio
 async def test_full_verification_flow():
     """Test complete verification flow"""